@@ -0,0 +1,155 @@
+"""
+Compact alternative to the object based Trie in trie_driven_graph.
+
+Every TrieNode allocates a Python object plus a list of n_alpha child pointers, which adds up to hundreds
+of bytes per node and forces pointer chasing on every lookup. ArrayTrie keeps the same insert/search
+contract but stores all nodes in contiguous typed arrays:
+
+    children: array('i') of n_nodes * n_alpha child indices (0 is the null pointer, root is node 0)
+    terminal: bytearray bitset with one bit per node marking the end of a valid word
+"""
+from array import array
+import sys
+import typing as t
+import time
+
+
+class ArrayTrie(object):
+    """Trie whose nodes are rows of a flat integer child table rather than individual objects."""
+    def __init__(self, alphabet: t.Dict[str, int]):
+        """
+        Create the ArrayTrie with available alphabet.
+
+        Nodes are identified by their row number in the child table. The child of node n for the letter
+        with index i lives at children[n * n_alpha + i]; a value of 0 means no child since the root (node 0)
+        can never be the child of another node.
+
+        Args:
+            alphabet: alphabet should map the potential characters in the available alphabet to their
+                      respective index for efficient lookup
+
+        """
+        self.alphabet = alphabet
+        self.n_alpha = len(alphabet)
+        self._empty_row = array('i', bytes(4 * self.n_alpha))  # appended for every new node
+        self.children = array('i', self._empty_row)  # row for the root node
+        self.terminal = bytearray(1)  # one bit per node, grows 8 nodes at a time
+        self.n_nodes = 1
+
+    def _new_node(self) -> int:
+        """Append an empty row to the child table and return its node index."""
+        node = self.n_nodes
+        self.children.extend(self._empty_row)
+        self.n_nodes += 1
+        if node >> 3 >= len(self.terminal):
+            self.terminal.append(0)
+        return node
+
+    def is_word(self, node: int) -> bool:
+        """Check the terminal bit of a node."""
+        return bool(self.terminal[node >> 3] >> (node & 7) & 1)
+
+    def child(self, node: int, char: int) -> int:
+        """Get the child of node for the letter with alphabet index char (0 if there is none)."""
+        return self.children[node * self.n_alpha + char]
+
+    def insert(self, new_word: str):
+        """
+        Insert a new word into the ArrayTrie. May be subset or superset of existing words or completely new.
+
+        Args:
+            new_word: full word to insert in the Trie. Will add between 0 and m nodes for word of length m
+
+        Raises:
+            ValueError: if word contains letters which are not part of available alphabet.
+
+        """
+        node = 0  # current node in trie
+        for letter in new_word:  # traverse word one char at a time
+            char = self.alphabet.get(letter)  # get index for particular char
+            if char is None:
+                raise ValueError(f'Character {letter} is not in available alphabet')
+            slot = node * self.n_alpha + char
+            if not self.children[slot]:
+                # add a node for this char if not already present at this level
+                self.children[slot] = self._new_node()
+            node = self.children[slot]  # move to the proper node in trie's next level
+        self.terminal[node >> 3] |= 1 << (node & 7)  # mark that this node terminates a valid word
+
+    def search(self, key: str) -> t.Tuple[bool, bool]:
+        """
+        Search the ArrayTrie to determine if a key is a valid word or the prefix of some valid word.
+
+        Args:
+            key: prefix to search for (may be full word or substring)
+
+        Raises:
+            ValueError: if word contains letters which are not part of available alphabet.
+
+        Returns:
+            key is valid word, key is prefix to other valid words
+
+        """
+        if not set(key).issubset(self.alphabet):
+            raise ValueError(f'{key} contains characters which are not in available alphabet')
+        children, n_alpha, alphabet = self.children, self.n_alpha, self.alphabet
+        node = 0  # current node in trie
+        for letter in key:  # traverse word one char at a time
+            node = children[node * n_alpha + alphabet[letter]]
+            if not node:
+                return False, False  # branch dies before end of key
+        row = node * n_alpha
+        return self.is_word(node), any(children[row:row + n_alpha])
+
+    def nbytes(self) -> int:
+        """Total bytes held by the child table and terminal bitset."""
+        return sys.getsizeof(self.children) + sys.getsizeof(self.terminal)
+
+    def bytes_per_node(self) -> float:
+        """Average number of bytes used to store each node."""
+        return self.nbytes() / self.n_nodes
+
+
+if __name__ == '__main__':
+    import random
+    import tracemalloc
+
+    from trie_driven_graph import Trie
+
+    # read in sample dictionary - taken from https://www.mit.edu/~ecprice/wordlist.10000
+    with open('../data/english_words.txt') as f:
+        word_dictionary = sorted(set(f.read().splitlines()))
+
+    alpha_dict = {l: i for i, l in enumerate(sorted(set(''.join(word_dictionary))))}
+
+    def build(trie_class):
+        tracemalloc.start()
+        start = time.time()
+        trie = trie_class(alpha_dict)
+        for word in word_dictionary:
+            trie.insert(word)
+        build_time = time.time() - start
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return trie, build_time, size
+
+    object_trie, object_build, object_bytes = build(Trie)
+    array_trie, array_build, array_bytes = build(ArrayTrie)
+
+    # look up every word plus the same number of random (mostly invalid) strings
+    keys = word_dictionary + [''.join(random.choices(list(alpha_dict), k=random.randint(1, 8)))
+                              for _ in word_dictionary]
+    assert all(object_trie.search(k) == array_trie.search(k) for k in keys)
+
+    def lookup_time(trie):
+        start = time.time()
+        for k in keys:
+            trie.search(k)
+        return time.time() - start
+
+    print(f'{len(word_dictionary)} words, {array_trie.n_nodes} nodes, alphabet of {len(alpha_dict)} letters')
+    print(f'{"Backend":<12}{"build (s)":>12}{"bytes":>12}{"bytes/node":>12}{"lookup (s)":>12}')
+    print(f'{"TrieNode":<12}{object_build:>12.4f}{object_bytes:>12}'
+          f'{object_bytes / array_trie.n_nodes:>12.1f}{lookup_time(object_trie):>12.4f}')
+    print(f'{"ArrayTrie":<12}{array_build:>12.4f}{array_bytes:>12}'
+          f'{array_trie.bytes_per_node():>12.1f}{lookup_time(array_trie):>12.4f}')
@@ -0,0 +1,137 @@
+"""
+Solve many boards against one shared dictionary using a process pool.
+
+The dictionary Trie is handed to each worker process exactly once rather than being pickled with every task:
+with the fork start method workers inherit the parent's Trie through copy-on-write memory, otherwise it is
+sent once per worker through the pool initializer. Only the board letters travel with each task and only the
+found words (plus timing) travel back.
+"""
+import contextlib
+import gc
+import multiprocessing as mp
+import multiprocessing.pool
+import os
+import time
+import typing as t
+
+from trie_driven_graph import Grid, Trie, build_trie
+
+Board = t.List[t.List[str]]
+
+_DICTIONARY: t.Optional[Trie] = None  # dictionary used by worker processes
+
+
+def _init_worker(dictionary: t.Optional[Trie]):
+    """Install the dictionary in a worker (None when it was already inherited via fork)."""
+    global _DICTIONARY
+    if dictionary is not None:
+        _DICTIONARY = dictionary
+
+
+def _solve(task: t.Tuple[int, Board]) -> t.Tuple[int, set, float]:
+    index, rows = task
+    start = time.perf_counter()
+    words = Grid(rows, _DICTIONARY).find_words()
+    return index, words, time.perf_counter() - start
+
+
+def worker_dictionary() -> Trie:
+    """Dictionary installed in this worker process by dictionary_pool."""
+    return _DICTIONARY
+
+
+@contextlib.contextmanager
+def dictionary_pool(dictionary: Trie, workers: int) -> t.Iterator[mp.pool.Pool]:
+    """
+    Process pool whose workers can all reach one dictionary through worker_dictionary().
+
+    With the fork start method the workers inherit the parent's Trie; otherwise it is pickled once per worker
+    through the pool initializer. Either way it is never sent along with individual tasks.
+
+    Args:
+        dictionary: Trie to share with the workers
+        workers: number of worker processes
+
+    Returns:
+        context manager yielding the pool
+
+    """
+    global _DICTIONARY
+    forked = 'fork' in mp.get_all_start_methods()
+    if forked:
+        context = mp.get_context('fork')
+        _DICTIONARY = dictionary  # inherited by the forked workers without pickling
+        gc.freeze()  # keep the collector from touching (and so copying) the inherited trie pages
+        initargs = (None,)
+    else:
+        context = mp.get_context()
+        initargs = (dictionary,)  # pickled once per worker
+
+    try:
+        with context.Pool(workers, initializer=_init_worker, initargs=initargs) as pool:
+            yield pool
+    finally:
+        if forked:
+            gc.unfreeze()
+            _DICTIONARY = None
+
+
+def solve_many(boards: t.Iterable[Board], dictionary: t.Union[Trie, t.Iterable[str]],
+               workers: t.Optional[int] = None, chunksize: int = 1,
+               ordered: bool = True) -> t.Iterator[t.Tuple[int, set, float]]:
+    """
+    Find the words on many boards in parallel, streaming results back as they are ready.
+
+    Args:
+        boards: boards given as rows of letters; consumed lazily so it may be a generator
+        dictionary: shared Trie (see build_trie) or a word list to build one from
+        workers: number of worker processes, defaults to the CPU count; 1 solves in this process
+        chunksize: number of boards sent to a worker per task; larger chunks amortize IPC for small boards
+        ordered: yield results in board order if True, otherwise as soon as each board completes
+
+    Returns:
+        iterator of (board index, set of words found, seconds spent solving the board)
+
+    """
+    if not isinstance(dictionary, Trie):
+        dictionary = build_trie(dictionary)
+    workers = workers or os.cpu_count()
+
+    if workers == 1:
+        for index, rows in enumerate(boards):
+            start = time.perf_counter()
+            yield index, Grid(rows, dictionary).find_words(), time.perf_counter() - start
+        return
+
+    with dictionary_pool(dictionary, workers) as pool:
+        mapper = pool.imap if ordered else pool.imap_unordered
+        yield from mapper(_solve, enumerate(boards), chunksize)
+
+
+if __name__ == '__main__':
+    import random
+
+    # read in sample dictionary - taken from https://www.mit.edu/~ecprice/wordlist.10000
+    with open('../data/english_words.txt') as f:
+        word_dictionary = set(f.read().splitlines())
+
+    start_time = time.time()
+    word_trie = build_trie(word_dictionary)
+    print(f'Built shared trie in {time.time() - start_time:.4f}s')
+
+    # random 4x4 boards drawn with the letter frequencies of the dictionary
+    letter_pool = ''.join(word_dictionary)
+    random.seed(0)
+    BOARDS = [[random.choices(letter_pool, k=4) for _ in range(4)] for _ in range(2000)]
+
+    print(f'{"workers":>8}{"chunksize":>10}{"boards/s":>12}{"speedup":>10}{"mean board (ms)":>17}')
+    baseline = None
+    for n_workers in sorted({1, 2, 4, os.cpu_count()}):
+        start_time = time.time()
+        results = list(solve_many(BOARDS, word_trie, workers=n_workers, chunksize=32))
+        elapsed = time.time() - start_time
+        assert [r[0] for r in results] == list(range(len(BOARDS)))
+        baseline = baseline or elapsed
+        mean_board = sum(r[2] for r in results) / len(results)
+        print(f'{n_workers:>8}{32:>10}{len(BOARDS) / elapsed:>12.0f}{baseline / elapsed:>10.2f}'
+              f'{mean_board * 1000:>17.3f}')
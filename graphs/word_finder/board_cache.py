@@ -0,0 +1,232 @@
+"""
+Memoizing layer around Grid solving keyed by the canonical form of a board.
+
+Rotating or reflecting a board does not change which words it contains, only where they are. BoardCache maps
+each board to the smallest of its 8 symmetric variants (rotations by 90 degrees turn an R x C board into a C x R
+one, which is still a valid board), solves that canonical board once and maps every word's path back to the
+orientation of the board that was asked for.
+
+Results live in a bounded LRU whose size is measured in approximate bytes, with an optional shelve file behind
+it so that solutions survive restarts. Hit, miss and eviction counters are kept for monitoring.
+"""
+from collections import OrderedDict
+import hashlib
+import shelve
+import sys
+import typing as t
+
+from trie_driven_graph import Grid, Trie
+
+Board = t.List[t.List[str]]
+Solution = t.Dict[str, t.Tuple[int, ...]]  # word -> one path of flat cell indices spelling it
+
+
+def _symmetries(R: int, C: int) -> t.List[t.Tuple[int, int, t.List[int]]]:
+    """
+    All 8 rotations and reflections of an R x C board.
+
+    Returns:
+        list of (rows, columns, source) where source[j] is the original flat index of cell j after the transform
+
+    """
+    transforms = [
+        (R, C, lambda r, c: (r, c)),  # identity
+        (C, R, lambda r, c: (R - 1 - c, r)),  # rotate 90 degrees clockwise
+        (R, C, lambda r, c: (R - 1 - r, C - 1 - c)),  # rotate 180 degrees
+        (C, R, lambda r, c: (c, C - 1 - r)),  # rotate 270 degrees
+        (R, C, lambda r, c: (r, C - 1 - c)),  # mirror left to right
+        (R, C, lambda r, c: (R - 1 - r, c)),  # mirror top to bottom
+        (C, R, lambda r, c: (c, r)),  # transpose
+        (C, R, lambda r, c: (R - 1 - c, C - 1 - r)),  # anti-transpose
+    ]
+    result = []
+    for rows, cols, source_cell in transforms:
+        source = []
+        for r in range(rows):
+            for c in range(cols):
+                sr, sc = source_cell(r, c)
+                source.append(sr * C + sc)
+        result.append((rows, cols, source))
+    return result
+
+
+def canonical_form(rows: Board) -> t.Tuple[t.Tuple[int, int, t.Tuple[str, ...]], t.List[int]]:
+    """
+    Find the canonical orientation of a board.
+
+    Args:
+        rows: letters arranged in columns and rows
+
+    Returns:
+        key of the canonical board as (rows, columns, flattened letters), and source where source[j] is the
+        index in the original board of cell j of the canonical board
+
+    """
+    letters = [l for row in rows for l in row]
+    best = None
+    for R, C, source in _symmetries(len(rows), len(rows[0])):
+        key = (R, C, tuple(letters[i] for i in source))
+        if best is None or key < best[0]:
+            best = (key, source)
+    return best
+
+
+class BoardCache(object):
+    """Bounded LRU of board solutions shared across symmetric boards, with an optional on-disk tier."""
+    def __init__(self, dictionary: Trie, max_bytes: int = 64 * 2 ** 20, path: t.Optional[str] = None,
+                 namespace: str = ''):
+        """
+        Create an empty cache for boards solved against one dictionary.
+
+        Args:
+            dictionary: Trie used to solve boards on a miss
+            max_bytes: approximate memory budget of the in-memory tier
+            path: optional shelve file used as a persistent second tier
+            namespace: distinguishes on-disk entries made with different dictionaries; change it whenever the
+                       dictionary changes but the path is reused
+
+        """
+        self.dictionary = dictionary
+        self.max_bytes = max_bytes
+        self.namespace = namespace
+        self.entries: 'OrderedDict[tuple, t.Tuple[Solution, int]]' = OrderedDict()  # key -> (solution, bytes)
+        self.nbytes = 0
+        self.disk = shelve.open(path) if path else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def close(self):
+        """Flush and close the on-disk tier."""
+        if self.disk is not None:
+            self.disk.close()
+            self.disk = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def counters(self) -> t.Dict[str, int]:
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self.entries),
+            'bytes': self.nbytes,
+        }
+
+    @staticmethod
+    def _size(key: tuple, solution: Solution) -> int:
+        """Approximate bytes held by an entry."""
+        size = sys.getsizeof(key) + sys.getsizeof(key[2]) + sys.getsizeof(solution)
+        for word, path in solution.items():
+            size += sys.getsizeof(word) + sys.getsizeof(path)
+        return size
+
+    def _disk_key(self, key: tuple) -> str:
+        return hashlib.sha1(repr((self.namespace, key)).encode('utf-8')).hexdigest()
+
+    def _store(self, key: tuple, solution: Solution):
+        size = self._size(key, solution)
+        if size > self.max_bytes:
+            return  # would evict everything else and still not fit
+        self.entries[key] = (solution, size)
+        self.nbytes += size
+        while self.nbytes > self.max_bytes:
+            _, (_, evicted) = self.entries.popitem(last=False)  # least recently used
+            self.nbytes -= evicted
+            self.evictions += 1
+
+    def solve(self, rows: Board) -> Solution:
+        """
+        Find every word on the board with one path for each, using cached results where possible.
+
+        Args:
+            rows: letters arranged in columns and rows
+
+        Returns:
+            dict of word -> tuple of flat cell indices (r * C + c) of the given board spelling the word
+
+        """
+        key, source = canonical_form(rows)
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            solution = self.entries[key][0]
+        else:
+            solution = None
+            if self.disk is not None:
+                solution = self.disk.get(self._disk_key(key))
+                if solution is not None:
+                    self.disk_hits += 1
+            if solution is None:
+                self.misses += 1
+                R, C, letters = key
+                canonical_rows = [list(letters[r * C:(r + 1) * C]) for r in range(R)]
+                solution = dict(Grid(canonical_rows, self.dictionary).iter_words())
+                if self.disk is not None:
+                    self.disk[self._disk_key(key)] = solution
+            self._store(key, solution)
+        # translate canonical cell indices back into the orientation of the given board
+        return {word: tuple(source[i] for i in path) for word, path in solution.items()}
+
+
+if __name__ == '__main__':
+    import os
+    import random
+    import tempfile
+    import time
+
+    from trie_driven_graph import build_trie
+
+    # read in sample dictionary - taken from https://www.mit.edu/~ecprice/wordlist.10000
+    with open('../data/english_words.txt') as f:
+        word_trie = build_trie(f.read().splitlines())
+
+    def rotate(rows: Board) -> Board:
+        return [list(row) for row in zip(*rows[::-1])]
+
+    # every symmetric variant maps back to a valid path spelling the word on that variant
+    ROWS = [['r', 'a', 'e', 'l', 'm'], ['o', 'f', 's', 't', 'e'], ['o', 'k', 'n', 'a', 't']]
+    variants = [ROWS, rotate(ROWS), rotate(rotate(ROWS)), rotate(rotate(rotate(ROWS))), [r[::-1] for r in ROWS]]
+    with BoardCache(word_trie) as cache:
+        for rows in variants:
+            letters, C = [l for row in rows for l in row], len(rows[0])
+            solution = cache.solve(rows)
+            assert set(solution) == Grid(rows, word_trie).find_words()
+            for word, path in solution.items():
+                assert ''.join(letters[i] for i in path) == word
+                assert all(max(abs(a // C - b // C), abs(a % C - b % C)) == 1 for a, b in zip(path, path[1:]))
+        print('Symmetric variants:', cache.counters())
+
+    # a stream where most boards repeat in some orientation, against a small memory budget
+    random.seed(0)
+    letter_pool = ''.join(word_trie.alphabet)
+    base_boards = [[random.choices(letter_pool, k=4) for _ in range(4)] for _ in range(200)]
+    stream = []
+    for _ in range(2000):
+        rows = random.choice(base_boards)
+        for _ in range(random.randrange(4)):
+            rows = rotate(rows)
+        stream.append(rows if random.random() < 0.5 else [r[::-1] for r in rows])
+
+    start_time = time.time()
+    for rows in stream:
+        Grid(rows, word_trie).find_words()
+    uncached = time.time() - start_time
+
+    with tempfile.TemporaryDirectory() as tmp:
+        disk_path = os.path.join(tmp, 'solutions')
+        with BoardCache(word_trie, max_bytes=256 * 2 ** 10, path=disk_path) as cache:
+            start_time = time.time()
+            for rows in stream:
+                cache.solve(rows)
+            print(f'Uncached {uncached:.3f}s, cached {time.time() - start_time:.3f}s:', cache.counters())
+        with BoardCache(word_trie, path=disk_path) as cache:  # fresh process, warm disk tier
+            for rows in stream[:100]:
+                cache.solve(rows)
+            print('After restart:', cache.counters())
@@ -0,0 +1,167 @@
+"""
+Search for high scoring boards with simulated annealing.
+
+Each step mutates one tile, rescores the board and accepts or rejects the change. Rescoring does not re-solve the
+board: Grid.set_cell re-searches only the paths through the changed tile and reports the words gained and lost,
+so the score is updated from that difference and a rejected mutation is undone the same way. All restarts share
+one dictionary Trie, and parallel restarts run in a process pool whose workers inherit it (see batch_solve).
+"""
+import math
+import os
+import random
+import typing as t
+import time
+
+from batch_solve import dictionary_pool, worker_dictionary
+from trie_driven_graph import Grid, Trie
+
+Board = t.List[t.List[str]]
+
+
+def board_score(words: t.Iterable[str], dictionary: Trie) -> float:
+    """Total score of a set of words under the dictionary's scoring function."""
+    return sum(dictionary.score(word) for word in words)
+
+
+def anneal(dictionary: Trie, R: int = 4, C: int = 4, steps: int = 10000, t_start: float = 2.0,
+           t_end: float = 0.05, letters: t.Optional[str] = None, seed: t.Optional[int] = None,
+           incremental: bool = True) -> dict:
+    """
+    Run one simulated annealing restart from a random board.
+
+    The temperature falls geometrically from t_start to t_end. A mutation which raises the score is always kept;
+    one which lowers it by d is kept with probability exp(-d / temperature). With t_start == t_end == 0 this is
+    plain hill climbing.
+
+    Args:
+        dictionary: shared Trie whose scoring function scores each word found
+        R: number of rows on the board
+        C: number of columns on the board
+        steps: number of single-tile mutations to try
+        t_start: initial temperature
+        t_end: final temperature
+        letters: pool tiles are drawn from (repeat letters to weight them); defaults to the Trie's alphabet
+        seed: seed for this restart's random number generator
+        incremental: rescore mutations with Grid.set_cell; when False every mutation re-solves the whole board
+                     (the baseline the incremental path is benchmarked against)
+
+    Returns:
+        dict: representation of results
+            board: best board found, as rows of letters
+            score: score of the best board
+            words: words on the best board
+            solves: number of boards scored (the initial solve plus one per mutation which changed a tile;
+                    mutations drawing the tile already there and undoing rejected mutations are not counted)
+            accepted: number of mutations kept
+            time: the time spent annealing (in seconds)
+
+    """
+    rng = random.Random(seed)
+    pool = letters or ''.join(dictionary.alphabet)
+    start = time.perf_counter()
+
+    rows = [[rng.choice(pool) for _ in range(C)] for _ in range(R)]
+    grid = Grid(rows, dictionary)
+    score = board_score(grid.index_words(), dictionary)
+    best_score, best_letters, best_words = score, list(grid.letters), set(grid.word_paths)
+    accepted = 0
+    solves = 1
+
+    for step in range(steps):
+        temperature = t_start * (t_end / t_start) ** (step / max(steps - 1, 1)) if t_start > 0 else 0
+        cell = rng.randrange(R * C)
+        old, new = grid.letters[cell], rng.choice(pool)
+        if new == old:
+            continue
+        if incremental:
+            added, removed = grid.set_cell(cell // C, cell % C, new)
+        else:
+            previous, letters_now = grid, list(grid.letters)
+            letters_now[cell] = new
+            grid = Grid([letters_now[r * C:(r + 1) * C] for r in range(R)], dictionary)
+            before, after = set(previous.word_paths), grid.index_words()
+            added, removed = after - before, before - after
+        solves += 1
+        delta = board_score(added, dictionary) - board_score(removed, dictionary)
+        if delta >= 0 or temperature > 0 and rng.random() < math.exp(delta / temperature):
+            score += delta
+            accepted += 1
+            if score > best_score:
+                best_score, best_letters, best_words = score, list(grid.letters), set(grid.word_paths)
+        elif incremental:
+            grid.set_cell(cell // C, cell % C, old)  # undo the mutation
+        else:
+            grid = previous
+
+    return {
+        'board': [best_letters[r * C:(r + 1) * C] for r in range(R)],
+        'score': best_score,
+        'words': best_words,
+        'solves': solves,
+        'accepted': accepted,
+        'time': time.perf_counter() - start,
+    }
+
+
+def _anneal_task(kwargs: dict) -> dict:
+    return anneal(worker_dictionary(), **kwargs)
+
+
+def optimize(dictionary: Trie, restarts: int = 8, workers: t.Optional[int] = None, seed: int = 0,
+             **anneal_kwargs) -> t.List[dict]:
+    """
+    Run independent annealing restarts in parallel and return their results, best first.
+
+    Args:
+        dictionary: shared Trie, inherited by (or sent once to) each worker process
+        restarts: number of independent restarts
+        workers: number of worker processes, defaults to the CPU count; 1 runs in this process
+        seed: base seed; restart i uses seed + i so runs are reproducible
+        anneal_kwargs: passed on to anneal (R, C, steps, t_start, t_end, letters)
+
+    Returns:
+        list of anneal results sorted by descending score
+
+    """
+    tasks = [dict(anneal_kwargs, seed=seed + i) for i in range(restarts)]
+    workers = workers or os.cpu_count()
+    if workers == 1:
+        results = [anneal(dictionary, **task) for task in tasks]
+    else:
+        with dictionary_pool(dictionary, workers) as pool:
+            results = pool.map(_anneal_task, tasks)
+    return sorted(results, key=lambda result: -result['score'])
+
+
+if __name__ == '__main__':
+    from trie_driven_graph import build_trie
+
+    def boggle_score(word: str) -> int:
+        return {3: 1, 4: 1, 5: 2, 6: 3, 7: 5}.get(len(word), 11)
+
+    # read in sample dictionary - taken from https://www.mit.edu/~ecprice/wordlist.10000
+    with open('../data/english_words.txt') as f:
+        word_dictionary = set(f.read().splitlines())
+    word_trie = build_trie(word_dictionary, score=boggle_score)
+    letter_pool = ''.join(word_dictionary)  # draw tiles with the letter frequencies of the dictionary
+
+    # Throughput of full re-solves against incremental rescoring along the same annealing trajectory
+    n_solves = 1000
+    print(f'{"board":>7}{"full solves/s":>15}{"incremental solves/s":>22}')
+    for size in [4, 6, 10]:
+        full = anneal(word_trie, size, size, steps=n_solves, letters=letter_pool, seed=0, incremental=False)
+        result = anneal(word_trie, size, size, steps=n_solves, letters=letter_pool, seed=0)
+        assert result['board'] == full['board'] and result['score'] == full['score']
+        # the incremental score agrees with a fresh solve of the best board
+        assert result['score'] == board_score(Grid(result['board'], word_trie).find_words(), word_trie)
+        print(f'{f"{size}x{size}":>7}{full["solves"] / full["time"]:>15.0f}{result["solves"] / result["time"]:>22.0f}')
+
+    start_time = time.time()
+    results = optimize(word_trie, restarts=4, steps=2000, letters=letter_pool)
+    elapsed = time.time() - start_time
+    total_solves = sum(r['solves'] for r in results)
+    print(f'{len(results)} restarts, {total_solves / elapsed:.0f} solves/s overall')
+    best = results[0]
+    print(f'Best score {best["score"]} with {len(best["words"])} words:')
+    for row in best['board']:
+        print(' '.join(row))
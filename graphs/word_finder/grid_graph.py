@@ -0,0 +1,130 @@
+"""
+Graph structure shared by the word finder grids.
+
+A board of R rows and C columns is flattened row by row, so cell (r, c) has index r * C + c. Adjacency is held
+in compressed sparse row form: one array of neighbor indices for all cells and one array of offsets into it,
+so a 1000x1000 board needs two flat int arrays rather than a million Python lists.
+"""
+from array import array
+from collections import Counter
+import sys
+import typing as t
+
+
+class NeighborTable(object):
+    """Precomputed adjacency (including diagonals) of every cell in an R x C grid."""
+    def __init__(self, R: int, C: int):
+        """
+        Build the neighbor table in time and memory linear in the number of cells.
+
+        Args:
+            R: number of rows
+            C: number of columns
+
+        """
+        self.R = R
+        self.C = C
+        self.offsets = array('i', [0])  # neighbors of cell i are cells[offsets[i]:offsets[i + 1]]
+        self.cells = array('i')
+
+        # a cell's neighbor offsets only depend on whether it sits on the first/last row and column, so
+        # there are at most nine distinct patterns; they are keyed by (row edges, column edges)
+        def edges(i: int, n: int) -> t.Tuple[bool, bool]:
+            return i == 0, i == n - 1
+
+        def steps(first: bool, last: bool) -> t.List[int]:
+            return [d for d in (-1, 0, 1) if not (d < 0 and first or d > 0 and last)]
+
+        patterns = {}
+        for row_edges in {edges(r, R) for r in (0, min(1, R - 1), R - 1)}:
+            for col_edges in {edges(c, C) for c in (0, min(1, C - 1), C - 1)}:
+                patterns[row_edges, col_edges] = [dr * C + dc for dr in steps(*row_edges)
+                                                  for dc in steps(*col_edges) if dr or dc]
+
+        cells, offsets = self.cells, self.offsets
+        col_edges = [edges(c, C) for c in range(C)]
+        for r in range(R):
+            row_edges = edges(r, R)
+            base = r * C
+            for c in range(C):
+                cells.extend([base + c + d for d in patterns[row_edges, col_edges[c]]])
+                offsets.append(len(cells))
+
+    def __getitem__(self, i: int) -> array:
+        return self.cells[self.offsets[i]:self.offsets[i + 1]]
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def nbytes(self) -> int:
+        """Total bytes held by the offset and neighbor arrays."""
+        return sys.getsizeof(self.offsets) + sys.getsizeof(self.cells)
+
+
+class SearchStats(object):
+    """
+    Counters collected by the word finder searches when a stats object is passed in.
+
+    Searches only touch these counters on their instrumented code path, so leaving stats off costs nothing.
+    The same object may be passed to several searches (e.g. one per start cell) to accumulate totals.
+    """
+    def __init__(self):
+        self.paths_expanded = 0  # partial paths taken off the frontier (or stepped into, depth-first)
+        self.nodes_visited = 0  # trie nodes stepped through while checking prefixes
+        self.prefixes_pruned = 0  # candidate paths dropped because no word continues them
+        self.peak_frontier = 0  # most partial paths held at once
+        self.words_by_depth = Counter()  # word paths found, keyed by word length
+        self.cell_times = {}  # seconds spent searching from each start cell
+
+    def as_dict(self) -> dict:
+        """Plain dict of all counters, e.g. for logging or JSON output."""
+        return {
+            'paths_expanded': self.paths_expanded,
+            'nodes_visited': self.nodes_visited,
+            'prefixes_pruned': self.prefixes_pruned,
+            'peak_frontier': self.peak_frontier,
+            'words_by_depth': dict(sorted(self.words_by_depth.items())),
+            'cell_times': dict(self.cell_times),
+        }
+
+    def __repr__(self) -> str:
+        counters = self.as_dict()
+        counters['cell_times'] = f'{sum(self.cell_times.values()):.6f}s over {len(self.cell_times)} cells'
+        return f'SearchStats({", ".join(f"{k}={v}" for k, v in counters.items())})'
+
+
+if __name__ == '__main__':
+    from collections import defaultdict
+    import time
+    import tracemalloc
+
+    def legacy_graph(R: int, C: int) -> defaultdict:
+        """Previous per-cell list construction (with the flat index corrected for rectangular boards)."""
+        graph = defaultdict(list)
+        for r in range(R):
+            for c in range(C):
+                i = r * C + c
+                neighbors = [x * C + y for x in range(r - 1, r + 2) for y in range(c - 1, c + 2)
+                             if 0 <= x < R and 0 <= y < C]
+                graph[i] = [n for n in neighbors if n != i]
+        return graph
+
+    # sanity check the table against the straightforward construction on awkward shapes
+    for shape in [(1, 1), (1, 5), (5, 1), (2, 3), (4, 4), (3, 7)]:
+        table, graph = NeighborTable(*shape), legacy_graph(*shape)
+        assert [list(table[i]) for i in range(len(table))] == [graph[i] for i in range(len(table))], shape
+
+    print(f'{"shape":>12}{"cells":>10}{"build (s)":>11}{"us/cell":>9}{"bytes":>12}{"B/cell":>8}{"legacy B/cell":>15}')
+    for R, C in [(4, 4), (10, 20), (100, 200), (300, 600), (500, 1000), (1000, 1000)]:
+        start = time.time()
+        table = NeighborTable(R, C)
+        elapsed = time.time() - start
+        legacy = ''
+        if R * C <= 20000:
+            tracemalloc.start()
+            graph = legacy_graph(R, C)
+            legacy = f'{tracemalloc.get_traced_memory()[0] / (R * C):.1f}'
+            tracemalloc.stop()
+            del graph
+        print(f'{f"{R}x{C}":>12}{R * C:>10}{elapsed:>11.4f}{elapsed / (R * C) * 1e6:>9.3f}'
+              f'{table.nbytes():>12}{table.nbytes() / (R * C):>8.1f}{legacy:>15}')
@@ -0,0 +1,116 @@
+"""
+Letter-signature index for filtering a dictionary down to the words a board could possibly spell.
+
+The word finder scripts filter their dictionary per board with `set(word).difference(alpha)`, building a new set
+for every word on every board. SignatureIndex precomputes each word's letter-presence bitmask once and groups
+words by mask, so the per-board filter becomes an integer subset test per group (or a dict lookup per subset of
+the board's letters, whichever is fewer) with no allocation per word. Words which repeat a letter also keep
+their letter counts, so words needing more copies of a letter than the board holds are pruned as well.
+"""
+from collections import Counter
+import typing as t
+
+
+class SignatureIndex(object):
+    """Dictionary words grouped by the bitmask of letters they contain."""
+    def __init__(self, words: t.Iterable[str]):
+        """
+        Compute the signature of every word.
+
+        Args:
+            words: dictionary words (duplicates are ignored)
+
+        """
+        words = set(words)
+        self.alphabet = {l: i for i, l in enumerate(sorted(set(''.join(words))))}
+        # mask -> list of (word, repeated letters as ((bit, count), ...)); most words repeat nothing
+        self.groups: t.Dict[int, t.List[t.Tuple[str, t.Tuple[t.Tuple[int, int], ...]]]] = {}
+        for word in sorted(words, key=len):
+            mask, repeats = 0, []
+            for letter, count in Counter(word).items():
+                bit = self.alphabet[letter]
+                mask |= 1 << bit
+                if count > 1:
+                    repeats.append((bit, count))
+            self.groups.setdefault(mask, []).append((word, tuple(repeats)))
+
+    def __len__(self) -> int:
+        return sum(len(group) for group in self.groups.values())
+
+    def filter(self, letters: t.Iterable[str], max_len: t.Optional[int] = None) -> t.List[str]:
+        """
+        Find the words which only use letters on the board, no more often than the board holds them.
+
+        Args:
+            letters: every letter on the board, with repeats (e.g. the flattened grid)
+            max_len: longest word to keep, defaults to the number of letters on the board
+
+        Returns:
+            list of candidate words for the board
+
+        """
+        letters = list(letters)
+        max_len = len(letters) if max_len is None else max_len
+        counts = [0] * len(self.alphabet)
+        board_mask = 0
+        for letter, count in Counter(letters).items():
+            bit = self.alphabet.get(letter)
+            if bit is not None:
+                counts[bit] = count
+                board_mask |= 1 << bit
+
+        if 1 << bin(board_mask).count('1') < len(self.groups):
+            groups = []  # few board letters: look up every subset of them (standard submask enumeration)
+            sub = board_mask
+            while sub:
+                if sub in self.groups:
+                    groups.append(self.groups[sub])
+                sub = (sub - 1) & board_mask
+        else:
+            groups = [group for mask, group in self.groups.items() if not mask & ~board_mask]
+
+        found = []
+        for group in groups:
+            for word, repeats in group:  # groups are ordered by word length
+                if len(word) > max_len:
+                    break
+                for bit, count in repeats:
+                    if counts[bit] < count:
+                        break
+                else:
+                    found.append(word)
+        return found
+
+
+if __name__ == '__main__':
+    import random
+    import time
+
+    # read in sample dictionary - taken from https://www.mit.edu/~ecprice/wordlist.10000
+    with open('../data/english_words.txt') as f:
+        word_dictionary = set(f.read().splitlines())
+
+    start_time = time.time()
+    index = SignatureIndex(word_dictionary)
+    print(f'Indexed {len(index)} words into {len(index.groups)} signatures in {time.time() - start_time:.4f}s')
+
+    random.seed(0)
+    letter_pool = ''.join(word_dictionary)
+    boards = [random.choices(letter_pool, k=16) for _ in range(300)] + \
+             [random.choices(letter_pool, k=25) for _ in range(300)]
+
+    start_time = time.time()
+    expected = [{w for w in word_dictionary if not set(w).difference(b) and len(w) <= len(b)} for b in boards]
+    set_time = time.time() - start_time
+
+    start_time = time.time()
+    filtered = [index.filter(b) for b in boards]
+    index_time = time.time() - start_time
+
+    for board, words, alpha_words in zip(boards, filtered, expected):
+        counts = Counter(board)
+        # the index additionally drops words needing more copies of a letter than the board holds
+        assert set(words) == {w for w in alpha_words if not Counter(w) - counts}
+    kept = sum(map(len, filtered)) / sum(map(len, expected))
+    print(f'set difference filter: {len(boards) / set_time:8.0f} boards/s')
+    print(f'signature index:       {len(boards) / index_time:8.0f} boards/s (keeps {kept:.1%} after multiset pruning)')
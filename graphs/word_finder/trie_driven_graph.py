@@ -6,13 +6,20 @@ Words must be 3 or more letters.
 You may move to any of 8 adjacent letters, however, a word should not have multiple instances of the same cell.
 To check if a string is a valid word you may implement a naive dictionary solution for simplicity.
 """
-from collections import defaultdict, deque
+from collections import Counter, deque
+import heapq
 import typing as t
 import time
 
+from grid_graph import NeighborTable, SearchStats
+from signature_index import SignatureIndex
+from trie_index import load_index
+
 
 class TrieNode(object):
     """Nodes use a list of pointers which point to other nodes if path continues."""
+    __slots__ = ('children', 'isWord', 'mask', 'required', 'max_len', 'max_score')
+
     def __init__(self, n_alpha: int):
         """
         Create a new empty node for Trie (null pointers for letters in alphabet)
@@ -24,6 +31,10 @@ class TrieNode(object):
         # will have a key for each potential next letter
         self.children: t.List[t.Union[None, TrieNode]] = [None] * n_alpha
         self.isWord = False  # indicates if the path to this node represents a valid word
+        self.mask = 0  # bit i is set if the letter with alphabet index i appears in some word below this node
+        self.required = -1  # letters every word below this node still needs (all bits set while none continues)
+        self.max_len = 0  # most letters still to come in any word through this node
+        self.max_score = float('-inf')  # best score of any word through this node
 
 
 class Trie(object):
@@ -34,7 +45,7 @@ class Trie(object):
         https://en.wikipedia.org/wiki/Trie
 
     """
-    def __init__(self, alphabet: t.Dict[str, int]):
+    def __init__(self, alphabet: t.Dict[str, int], score: t.Optional[t.Callable[[str], float]] = None):
         """
         Create the Trie with available alphabet.
 
@@ -50,10 +61,13 @@ class Trie(object):
         Args:
             alphabet: alphabet should map the potential characters in the available alphabet to their
                       respective index for efficient lookup
+            score: scoring function for words, used to annotate nodes with the best score beneath them
+                   for top-k searches (defaults to word length)
 
         """
         self.alphabet = alphabet
         self.n_alpha = len(alphabet)
+        self.score = score or len
         self.root = TrieNode(self.n_alpha)
 
     def insert(self, new_word: str):
@@ -67,23 +81,42 @@ class Trie(object):
             ValueError: if word contains letters which are not part of available alphabet.
 
         """
-        node = self.root  # current node in trie
-        for level in range(len(new_word)):  # traverse word one char at a time
-            char = self.alphabet.get(new_word[level])  # get index for particular char
+        chars = []
+        for letter in new_word:
+            char = self.alphabet.get(letter)  # get index for particular char
             if char is None:
-                raise ValueError(f'Character {new_word[level]} is not in available alphabet')
-            if not node.children[char]:
-                # add a node for this char if not already present at this level
-                node.children[char] = TrieNode(self.n_alpha)
-            node = node.children[char]  # move to the proper node in trie's next level
+                raise ValueError(f'Character {letter} is not in available alphabet')
+            chars.append(char)
+
+        # suffix_masks[level] holds the letters still to come after `level` characters of the word
+        suffix_masks = [0] * (len(chars) + 1)
+        for level in range(len(chars) - 1, -1, -1):
+            suffix_masks[level] = suffix_masks[level + 1] | 1 << chars[level]
+
+        word_score = self.score(new_word)
+        node = self.root  # current node in trie
+        for level in range(len(chars) + 1):  # traverse word one char at a time
+            if level:
+                char = chars[level - 1]
+                if not node.children[char]:
+                    # add a node for this char if not already present at this level
+                    node.children[char] = TrieNode(self.n_alpha)
+                node = node.children[char]  # move to the proper node in trie's next level
+            # record letters, length and score reachable beneath this node
+            node.mask |= suffix_masks[level]
+            if level < len(chars):
+                node.required &= suffix_masks[level]
+            node.max_len = max(node.max_len, len(chars) - level)
+            node.max_score = max(node.max_score, word_score)
         node.isWord = True  # mark that this node terminates a valid word
 
-    def search(self, key: str) -> t.Tuple[bool, bool]:
+    def search(self, key: str, stats: t.Optional[SearchStats] = None) -> t.Tuple[bool, bool]:
         """
         Search the Trie to determine if a key is a valid word or the prefix of some valid word.
 
         Args:
             key: prefix to search for (may be full word or substring)
+            stats: optional counters, incremented by the number of trie nodes visited
 
         Raises:
             ValueError: if word contains letters which are not part of available alphabet.
@@ -98,14 +131,53 @@ class Trie(object):
         for level in range(len(key)):  # traverse word one char at a time
             char = self.alphabet.get(key[level])  # get index for particular char
             if not node.children[char]:
+                if stats is not None:
+                    stats.nodes_visited += level
                 return False, False  # branch dies before end of key
             node = node.children[char]  # move to the proper node in trie's next level
+        if stats is not None:
+            stats.nodes_visited += len(key)
         # Interested in whether the searched key is a word itself AND if it has any children
         return node is not None and node.isWord, any(node.children)
 
 
+class _Reversed(str):
+    """String which compares in reverse alphabetical order, so the min-heap in Grid.top_k evicts ties last-first."""
+    __slots__ = ()
+
+    def __lt__(self, other: str) -> bool:
+        return str.__gt__(self, other)
+
+    def __gt__(self, other: str) -> bool:
+        return str.__lt__(self, other)
+
+
+def build_trie(words: t.Iterable[str], score: t.Optional[t.Callable[[str], float]] = None) -> Trie:
+    """
+    Build a board-independent Trie over the full alphabet of a word list.
+
+    The same Trie can be shared by any number of Grid instances; each board prunes the subtrees it cannot
+    spell using the required-letter masks stored on every node, so no per-board filtering or rebuilding is
+    needed.
+
+    Args:
+        words: words to insert (duplicates are harmless)
+        score: optional scoring function passed on to the Trie (defaults to word length)
+
+    Returns:
+        Trie containing every word
+
+    """
+    words = set(words)
+    alphabet = {l: i for i, l in enumerate(sorted(set(''.join(words))))}
+    trie = Trie(alphabet, score)
+    for word in words:
+        trie.insert(word)
+    return trie
+
+
 class Grid:
-    """Stores an arbitrary arrangement of letters in a 4x4 grid in a Graph with edges between adjacent cells."""
+    """Stores an arbitrary arrangement of letters in an R x C grid in a Graph with edges between adjacent cells."""
     def __init__(self, rows: t.List[t.List[str]], dictionary: Trie):
         """
         Initializes the Grid with dimensions, flattened contents, graph structure and dictionary trie.
@@ -120,29 +192,41 @@ class Grid:
         self.C = len(rows[0])
         self.letters = []
         self.dictionary = dictionary
-        self.graph = defaultdict(list)  # key for each letter index with list of neighbors as value
-
-        for r, row in enumerate(rows):
-            for c, letter in enumerate(row):
-                i = r * self.R + c  # convert row,column to flat index
-                self.letters.append(letter)  # add cell contents to flattened list
-                neighbors = [x * self.R + y for x in range(r - 1, r + 2)  # adjacent rows
-                             for y in range(c - 1, c + 2)  # adjacent columns
-                             if 0 <= x < self.R  # avoid x-boundary
-                             and 0 <= y < self.C]  # avoid y-boundary
-                self.graph[i] = [c for c in neighbors if c != i]  # omit self from neighbors
-
-    def full_search(self, start: int) -> set:
+        for row in rows:
+            if len(row) != self.C:
+                raise ValueError('All rows of the grid must have the same number of columns')
+            self.letters.extend(row)  # flatten row by row, so cell (r, c) has index r * C + c
+        self.graph = NeighborTable(self.R, self.C)  # indexable by cell for array of neighbor indices
+        # visited flags shared by the depth-first searches; each search clears the cells it sets as it backtracks
+        self.visited = bytearray(len(self.letters))
+
+        # alphabet index of each cell's letter for the depth-first solver (None when not in the trie's alphabet)
+        self.codes = [dictionary.alphabet.get(letter) for letter in self.letters]
+        # letters this board can supply; subtrees whose words all need a missing letter are never walked
+        self.code_counts = Counter(code for code in self.codes if code is not None)
+        self.board_mask = 0
+        for code in self.code_counts:
+            self.board_mask |= 1 << code
+
+        # word -> paths and cell -> (word, path) index used for incremental re-solving (see index_words)
+        self.word_paths: t.Optional[t.Dict[str, t.Set[t.Tuple[int, ...]]]] = None
+        self.cell_paths: t.Dict[int, t.Set[t.Tuple[str, t.Tuple[int, ...]]]] = {}
+        self.min_len = 3
+
+    def full_search(self, start: int, stats: t.Optional[SearchStats] = None) -> set:
         """
         Search all possible paths from starting cell, terminating paths which are not valid words or prefixes.
 
         Args:
             start: index of starting cell in flattened letter array
+            stats: optional counters to collect; the uninstrumented loop runs when None
 
         Returns:
             set of valid words found when starting from this cell
 
         """
+        if stats is not None:
+            return self._full_search_stats(start, stats)
         paths = deque([[start]])  # initialize deque with starting path
         found_words = set()
         while paths:
@@ -153,7 +237,24 @@ class Grid:
             paths.extend(next_paths)  # add new paths to the back of deque for later searching
         return found_words
 
-    def search(self, path: t.List[int]):
+    def _full_search_stats(self, start: int, stats: SearchStats) -> set:
+        """Instrumented copy of full_search which records counters and timing in stats."""
+        began = time.perf_counter()
+        paths = deque([[start]])
+        found_words = set()
+        while paths:
+            stats.peak_frontier = max(stats.peak_frontier, len(paths))
+            path = paths.popleft()
+            stats.paths_expanded += 1
+            new_words, next_paths = self.search(path, stats)
+            for word in new_words:
+                stats.words_by_depth[len(word)] += 1
+            found_words.update(new_words)
+            paths.extend(next_paths)
+        stats.cell_times[start] = stats.cell_times.get(start, 0) + time.perf_counter() - began
+        return found_words
+
+    def search(self, path: t.List[int], stats: t.Optional[SearchStats] = None):
         # get all possible neighbor indices (unused in current word)
         neighbors = [l for l in self.graph[path[-1]] if l not in path]
 
@@ -163,22 +264,394 @@ class Grid:
         if len(path) < 2:
             # candidate_words must be 3 characters or longer
             return [], candidates
+        if not candidates:
+            return [], []  # dead end: every neighbor is already on the path (common on 1 x N and 2 x N boards)
 
         # translate index paths to corresponding letter sequences
         candidate_words = [''.join([self.letters[i] for i in candidate]) for candidate in candidates]
 
         # Check all candidate words for validity as words or prefixes
-        valid = [self.dictionary.search(cw) for cw in candidate_words]
+        if stats is None:
+            valid = [self.dictionary.search(cw) for cw in candidate_words]
+        else:
+            valid = [self.dictionary.search(cw, stats) for cw in candidate_words]
         valid_words, valid_candidates = list(zip(*valid))
 
         # Collect valid words and valid prefixes for further searching
         good_words = [w for i, w in enumerate(candidate_words) if valid_words[i]]
         good_candidates = [w for i, w in enumerate(candidates) if valid_candidates[i]]
+        if stats is not None:
+            stats.prefixes_pruned += len(candidates) - len(good_candidates)
 
         return good_words, good_candidates
 
+    def dfs_search(self, start: int, stats: t.Optional[SearchStats] = None) -> set:
+        """
+        Search all paths from starting cell depth-first, walking the Trie alongside the path.
+
+        Rather than rebuilding each candidate string and searching the Trie from its root, the current
+        TrieNode is carried as a cursor so that every extension is a single O(1) child lookup. Visited
+        cells are flagged in the Grid's bytearray (set and cleared as the path grows and backtracks, so it is
+        allocated once per board rather than once per start cell) and only the current path is held in
+        memory, so peak memory is bounded by the board size rather than the width of the search frontier.
+
+        Args:
+            start: index of starting cell in flattened letter array
+            stats: optional counters to collect; the uninstrumented walk runs when None
+
+        Returns:
+            set of valid words found when starting from this cell (same as full_search)
+
+        """
+        if stats is not None:
+            return self._dfs_search_stats(start, stats)
+        letters, codes, board_mask = self.letters, self.codes, self.board_mask
+        offsets, adjacent = self.graph.offsets, self.graph.cells
+        visited = self.visited
+        prefix = []  # letters along the current path
+        found_words = set()
+
+        def extend(cell: int, node: TrieNode):
+            code = codes[cell]
+            if code is None:
+                return  # letter is not part of the dictionary's alphabet
+            node = node.children[code]
+            if node is None:
+                return  # no word continues with this letter
+            prefix.append(letters[cell])
+            if node.isWord and len(prefix) >= 3:
+                found_words.add(''.join(prefix))
+            if not node.required & ~board_mask:  # skip when every word below needs a letter the board lacks
+                visited[cell] = 1
+                for k in range(offsets[cell], offsets[cell + 1]):
+                    if not visited[adjacent[k]]:  # skip cells already used in this path
+                        extend(adjacent[k], node)
+                visited[cell] = 0
+            prefix.pop()
+
+        extend(start, self.dictionary.root)
+        return found_words
+
+    def _dfs_search_stats(self, start: int, stats: SearchStats) -> set:
+        """Instrumented copy of dfs_search which records counters and timing in stats."""
+        began = time.perf_counter()
+        letters, codes, board_mask = self.letters, self.codes, self.board_mask
+        offsets, adjacent = self.graph.offsets, self.graph.cells
+        visited = self.visited
+        prefix = []
+        found_words = set()
+
+        def extend(cell: int, node: TrieNode):
+            code = codes[cell]
+            if code is None or node.children[code] is None:
+                stats.prefixes_pruned += 1
+                return
+            node = node.children[code]
+            stats.paths_expanded += 1
+            stats.nodes_visited += 1
+            prefix.append(letters[cell])
+            stats.peak_frontier = max(stats.peak_frontier, len(prefix))
+            if node.isWord and len(prefix) >= 3:
+                stats.words_by_depth[len(prefix)] += 1
+                found_words.add(''.join(prefix))
+            if not node.required & ~board_mask:
+                visited[cell] = 1
+                for k in range(offsets[cell], offsets[cell + 1]):
+                    if not visited[adjacent[k]]:
+                        extend(adjacent[k], node)
+                visited[cell] = 0
+            elif node.required != -1:
+                stats.prefixes_pruned += 1  # every word below needs a letter which is not on the board
+            prefix.pop()
+
+        extend(start, self.dictionary.root)
+        stats.cell_times[start] = stats.cell_times.get(start, 0) + time.perf_counter() - began
+        return found_words
+
+    def iter_words(self, min_len: int = 3, limit: t.Optional[int] = None, deadline: t.Optional[float] = None,
+                   dedupe: bool = True) -> t.Iterator[t.Tuple[str, t.Tuple[int, ...]]]:
+        """
+        Lazily yield words as soon as they are found, with optional early termination.
+
+        Performs the same trie-cursor depth-first walk as dfs_search, but with an explicit stack so that each
+        word can be handed to the caller immediately. The search stops as soon as the limit or time budget is
+        reached; abandoning the generator also stops the search.
+
+        Args:
+            min_len: shortest word to report
+            limit: stop after yielding this many results (no limit when None)
+            deadline: time budget in seconds, measured from the first call to next() (no budget when None)
+            dedupe: only report the first path found for each word; when False every path is reported and no
+                    set of seen words is kept, which is cheaper for callers that only need counts
+
+        Returns:
+            iterator of (word, path) where path is the tuple of flat cell indices spelling the word
+
+        """
+        if limit is not None and limit <= 0:
+            return
+        stop_at = None if deadline is None else time.perf_counter() + deadline
+        letters, codes, board_mask = self.letters, self.codes, self.board_mask
+        offsets, adjacent = self.graph.offsets, self.graph.cells
+        root = self.dictionary.root
+        visited = bytearray(len(letters))
+        seen = set() if dedupe else None
+        n_found = 0
+        n_steps = 0
+
+        for start in range(len(letters)):
+            if codes[start] is None or root.children[codes[start]] is None:
+                continue
+            # the path, the trie node at each step and the next neighbor slot to try at each step
+            path = [start]
+            nodes = [root.children[codes[start]]]
+            slots = [offsets[start]]
+            visited[start] = 1
+            new_node = nodes[0]
+            while path:
+                if new_node is not None:
+                    new_node = None
+                    if nodes[-1].isWord and len(path) >= min_len:
+                        word = ''.join([letters[i] for i in path])
+                        if seen is None or word not in seen:
+                            if seen is not None:
+                                seen.add(word)
+                            yield word, tuple(path)
+                            n_found += 1
+                            if limit is not None and n_found >= limit:
+                                return
+                cell, node, k = path[-1], nodes[-1], slots[-1]
+                if k == offsets[cell + 1] or node.required & ~board_mask:
+                    visited[cell] = 0  # exhausted this cell, backtrack
+                    path.pop()
+                    nodes.pop()
+                    slots.pop()
+                    continue
+                slots[-1] = k + 1
+                nxt = adjacent[k]
+                if visited[nxt] or codes[nxt] is None:
+                    continue
+                new_node = node.children[codes[nxt]]
+                if new_node is None:
+                    continue
+                path.append(nxt)
+                nodes.append(new_node)
+                slots.append(offsets[nxt])
+                visited[nxt] = 1
+                n_steps += 1
+                if stop_at is not None and not n_steps & 255 and time.perf_counter() >= stop_at:
+                    return  # checked every 256 steps to keep the clock off the hot path
+
+    def top_k(self, k: t.Optional[int], min_len: int = 3) -> dict:
+        """
+        Find the k highest scoring words on the board, ranked by score and then alphabetically.
+
+        Every trie node knows the best score and longest remaining length of the words beneath it (filled in
+        by Trie.insert using the Trie's scoring function). Once k words have been found, any branch whose best
+        possible score is below the current k-th best is abandoned, as is any branch whose words are all too
+        short to reach min_len. The result is always exactly the first k entries of the full ranking.
+
+        The score bound covers every word in the dictionary below a node rather than the words this board can
+        spell, so on a 4x4 board it cuts almost nothing and top_k is no faster than a full search. Only on
+        large boards, where a full search meets many more words, does it skip a useful share of the nodes.
+
+        Args:
+            k: number of words to return; None disables the bound and explores like a full search
+            min_len: shortest word to consider
+
+        Returns:
+            dict: representation of results
+                words: list of (word, score) tuples, best first (equal scores in alphabetical order)
+                explored: the number of trie nodes stepped into during the search
+
+        """
+        score = self.dictionary.score
+        letters, codes, board_mask = self.letters, self.codes, self.board_mask
+        offsets, adjacent = self.graph.offsets, self.graph.cells
+        visited = bytearray(len(letters))
+        prefix = []  # letters along the current path
+        best = []  # min-heap of (score, reversed word) holding the k best distinct words, worst ranked on top
+        in_best = set()
+        explored = 0
+
+        def extend(cell: int, node: TrieNode):
+            nonlocal explored
+            code = codes[cell]
+            if code is None or node.children[code] is None:
+                return
+            node = node.children[code]
+            explored += 1
+            if k is not None and len(best) == k and node.max_score < best[0][0]:
+                return  # nothing below can reach the current k-th best
+            if len(prefix) + 1 + node.max_len < min_len:
+                return  # every word below is too short
+            prefix.append(letters[cell])
+            if node.isWord and len(prefix) >= min_len:
+                word = ''.join(prefix)
+                if word not in in_best:
+                    entry = (score(word), _Reversed(word))
+                    if k is None or len(best) < k:
+                        heapq.heappush(best, entry)
+                        in_best.add(word)
+                    elif entry > best[0]:  # higher score, or equal score and alphabetically earlier
+                        in_best.discard(heapq.heapreplace(best, entry)[1])
+                        in_best.add(word)
+            if not node.required & ~board_mask:
+                visited[cell] = 1
+                for j in range(offsets[cell], offsets[cell + 1]):
+                    if not visited[adjacent[j]]:
+                        extend(adjacent[j], node)
+                visited[cell] = 0
+            prefix.pop()
+
+        if k is None or k > 0:
+            for start in range(len(letters)):
+                extend(start, self.dictionary.root)
+        return {
+            'words': [(str(w), s) for s, w in sorted(best, reverse=True)],
+            'explored': explored,
+        }
+
+    def find_words(self, stats: t.Optional[SearchStats] = None) -> set:
+        """
+        Find all valid words on the board by running a depth-first search from every cell.
+
+        Args:
+            stats: optional counters to collect across all start cells
+
+        Returns:
+            set of valid words found anywhere in the grid
+
+        """
+        all_words = set()
+        for i in range(len(self.letters)):
+            all_words |= self.dfs_search(i, stats)
+        return all_words
+
+    def index_words(self, min_len: int = 3) -> set:
+        """
+        Solve the board and index every path of every word so that later edits can be re-solved locally.
+
+        Args:
+            min_len: shortest word to report
+
+        Returns:
+            set of valid words found anywhere in the grid
+
+        """
+        self.min_len = min_len
+        self.word_paths, self.cell_paths = {}, {}
+        for word, path in self.iter_words(min_len=min_len, dedupe=False):
+            self._add_path(word, path)
+        return set(self.word_paths)
+
+    def _add_path(self, word: str, path: t.Tuple[int, ...]):
+        self.word_paths.setdefault(word, set()).add(path)
+        for cell in path:
+            self.cell_paths.setdefault(cell, set()).add((word, path))
+
+    def set_cell(self, r: int, c: int, letter: str) -> t.Tuple[set, set]:
+        """
+        Change the letter in one cell, re-solving only the paths which pass through it.
+
+        Words whose paths all run through the changed cell are dropped, then only paths that can reach the cell
+        are searched again: starts are limited to the cells within reach of the longest word in the Trie, and
+        a partial path is abandoned once the cell is further away than the longest word continuing below its
+        trie node. The cost therefore depends on the neighborhood of the edit rather than the board size.
+
+        Args:
+            r: row of the cell to change
+            c: column of the cell to change
+            letter: new contents of the cell
+
+        Raises:
+            IndexError: if the row or column is outside the grid.
+
+        Returns:
+            words newly found after the edit, words no longer found after the edit
+            (both empty unless index_words has been called)
+
+        """
+        if not (0 <= r < self.R and 0 <= c < self.C):
+            raise IndexError(f'Cell ({r}, {c}) is outside the {self.R}x{self.C} grid')
+        cell = r * self.C + c
+        old_code, code = self.codes[cell], self.dictionary.alphabet.get(letter)
+        self.letters[cell] = letter
+        self.codes[cell] = code
+        for changed, step in ((old_code, -1), (code, 1)):
+            if changed is not None:
+                self.code_counts[changed] += step
+                if self.code_counts[changed] > 0:
+                    self.board_mask |= 1 << changed
+                else:
+                    self.board_mask &= ~(1 << changed)
+        if self.word_paths is None:
+            return set(), set()
+
+        before = set()
+        for word, path in self.cell_paths.pop(cell, ()):
+            before.add(word)
+            paths = self.word_paths[word]
+            paths.discard(path)
+            if not paths:
+                del self.word_paths[word]
+            for other in path:
+                if other != cell:
+                    self.cell_paths[other].discard((word, path))
+
+        added = set()
+        for word, path in self._paths_through(cell):
+            if word not in self.word_paths and word not in before:
+                added.add(word)
+            self._add_path(word, path)
+        return added, {w for w in before if w not in self.word_paths}
+
+    def _paths_through(self, target: int) -> t.Iterator[t.Tuple[str, t.Tuple[int, ...]]]:
+        """Depth-first search yielding every (word, path) whose path includes the target cell."""
+        letters, codes, board_mask, min_len = self.letters, self.codes, self.board_mask, self.min_len
+        offsets, adjacent = self.graph.offsets, self.graph.cells
+        root = self.dictionary.root
+        tr, tc = divmod(target, self.C)
+        if codes[target] is None:
+            return iter(())
+        target_bit = 1 << codes[target]
+        visited = self.visited  # reuse the Grid buffer so an edit never allocates a board-sized array
+        path = []
+        found = []
+
+        def extend(cell: int, node: TrieNode, through: bool):
+            code = codes[cell]
+            if code is None or node.children[code] is None:
+                return
+            node = node.children[code]
+            through = through or cell == target
+            if not through:
+                if not node.mask & target_bit:
+                    return  # no word continuing from here uses the target's letter
+                r, c = divmod(cell, self.C)
+                if max(abs(r - tr), abs(c - tc)) > node.max_len:
+                    return  # target is further away than any word continuing from here
+            path.append(cell)
+            if through and node.isWord and len(path) >= min_len:
+                found.append((''.join([letters[i] for i in path]), tuple(path)))
+            if not node.required & ~board_mask:
+                visited[cell] = 1
+                for k in range(offsets[cell], offsets[cell + 1]):
+                    if not visited[adjacent[k]]:
+                        extend(adjacent[k], node, through)
+                visited[cell] = 0
+            path.pop()
+
+        reach = max(root.max_len - 1, 0)  # a word of n letters spans at most n - 1 steps
+        for r in range(max(tr - reach, 0), min(tr + reach + 1, self.R)):
+            for c in range(max(tc - reach, 0), min(tc + reach + 1, self.C)):
+                extend(r * self.C + c, root, False)
+        return iter(found)
+
 
 if __name__ == '__main__':
+    import random
+
     start_time = time.time()
 
     # initialize sample grid
@@ -191,20 +664,19 @@ if __name__ == '__main__':
     N_CELLS = len([l for row in ROWS for l in row])  # max word length
     ROWS = [[l.lower() for l in row] for row in ROWS]  # ensure lowercase for word-matching
 
-    # read in sample dictionary - taken from https://www.mit.edu/~ecprice/wordlist.10000
-    with open('../data/english_words.txt') as f:
-        word_dictionary = f.read().splitlines()
-    word_dictionary = set(word_dictionary)  # ensure no duplicate words passed in dict
-
     alpha = set(l for row in ROWS for l in row)  # get unique letters in grid
     alpha_dict = {l: i for i, l in enumerate(alpha)}  # convert unique letters to lookup map
 
+    # load sample dictionary - taken from https://www.mit.edu/~ecprice/wordlist.10000
+    # from the prebuilt index (compiled on first run) rather than parsing the text file
+    with load_index('../data/english_words.txt', '../data/english_words.trie') as index:
+        board_words = set(index.words(alpha, N_CELLS))  # only the grid's letters, no longer than grid
+        word_dictionary = set(index.words())  # full list for the shared trie and the larger boards below
+
     word_trie = Trie(alpha_dict)  # pass alpha_dict to Trie so as to not waste space with unavailable chars
-    filtered_dictionary = set()  # keep track of words after filtering for available chars
-    for word in word_dictionary:
-        if set(word).difference(alpha) or len(word) > N_CELLS:
-            continue  # skip words which are not subset of available alphabet or longer than grid
-        filtered_dictionary.add(word)
+    # keep only words spelled with the grid's letters (no more copies than the grid holds) and no longer than grid
+    filtered_dictionary = set(SignatureIndex(board_words).filter(l for row in ROWS for l in row))
+    for word in filtered_dictionary:
         word_trie.insert(word)
 
     print('Available Letters:', alpha)
@@ -213,9 +685,9 @@ if __name__ == '__main__':
     grid = Grid(ROWS, word_trie)
 
     # Examine grid construction
-    print(grid.graph[0])
-    print(grid.graph[3])
-    print(grid.graph[5])
+    print(list(grid.graph[0]))
+    print(list(grid.graph[3]))
+    print(list(grid.graph[5]))
     print(grid.search([0, 5]))
 
     all_words = set()
@@ -225,6 +697,115 @@ if __name__ == '__main__':
         assert(all_words.issubset(filtered_dictionary))
 
     print(f'Took {time.time() - start_time} to build dictionary and find {len(all_words)} words in grid')
+
+    # Compare against the depth-first trie-cursor solver
+    dfs_start = time.time()
+    dfs_words = grid.find_words()
+    assert dfs_words == all_words
+    print(f'Depth-first search found the same {len(dfs_words)} words in {time.time() - dfs_start}')
+
+    # Build one full-alphabet trie and reuse it; per-board setup is then only the Grid construction
+    shared_start = time.time()
+    shared_trie = build_trie(word_dictionary)
+    print(f'Built shared trie once in {time.time() - shared_start}')
+    board_start = time.time()
+    shared_grid = Grid(ROWS, shared_trie)
+    setup_time = time.time() - board_start
+    assert shared_grid.find_words() == all_words
+    print(f'Per-board setup took {setup_time}, solve with shared trie took {time.time() - board_start}')
+
+    # Stream words from the shared grid; the first result arrives before the board is exhausted
+    stream_start = time.time()
+    first_word, first_path = next(shared_grid.iter_words())
+    print(f'First streamed word {first_word!r} via cells {first_path} after {time.time() - stream_start}')
+    assert {w for w, _ in shared_grid.iter_words()} == all_words
+    assert len(list(shared_grid.iter_words(limit=5))) == 5
+    print(f'{sum(1 for _ in shared_grid.iter_words(dedupe=False))} paths spell the {len(all_words)} words')
+
+    # Opt-in instrumentation of both search strategies
+    bfs_stats, dfs_stats = SearchStats(), SearchStats()
+    assert set().union(*(shared_grid.full_search(i, bfs_stats) for i in range(N_CELLS))) == all_words
+    assert shared_grid.find_words(dfs_stats) == all_words
+    print('Breadth-first:', bfs_stats)
+    print('Depth-first:', dfs_stats)
+
+    # Required-letter pruning on the shared trie: pretending every letter is on the board disables it
+    unpruned_grid, unpruned_stats = Grid(ROWS, shared_trie), SearchStats()
+    unpruned_grid.board_mask = -1
+    assert unpruned_grid.find_words(unpruned_stats) == all_words
+    assert dfs_stats.nodes_visited < unpruned_stats.nodes_visited
+    print(f'Required-letter pruning visited {dfs_stats.nodes_visited} trie nodes '
+          f'instead of {unpruned_stats.nodes_visited}')
+
+    # Top-k search keeps exactly the first k words of the full ranking, whatever order they are found in; on a
+    # 4x4 board the dictionary-wide score bound barely prunes (see the 40x40 board below for where it does)
+    full = shared_grid.top_k(None)
+    assert {w for w, _ in full['words']} == all_words
+    print(f'{"k":>6}{"nodes explored":>16}{"vs full":>9}  best words')
+    for k in [1, 5, 20]:
+        top = shared_grid.top_k(k)
+        assert top['words'] == full['words'][:k]
+        print(f'{k:>6}{top["explored"]:>16}{top["explored"] / full["explored"]:>9.1%}  {top["words"][:5]}')
+
+    def boggle_score(word: str) -> int:
+        return {3: 1, 4: 1, 5: 2, 6: 3, 7: 5}.get(len(word), 11)
+
+    scored_grid = Grid(ROWS, build_trie(word_dictionary, score=boggle_score))
+    print('Top Boggle-scored words:', scored_grid.top_k(3)['words'])
+
+    # Incremental re-solve after single tile edits on a larger board
+    random.seed(0)
+    letter_pool = ''.join(word_dictionary)
+    big_rows = [random.choices(letter_pool, k=40) for _ in range(40)]
+    big_grid = Grid(big_rows, shared_trie)
+
+    # Where the score bound does pay off: a large board meets many more words than any top k
+    top_start = time.time()
+    big_full = big_grid.top_k(None)
+    full_time = time.time() - top_start
+    for k in [1, 5, 20]:
+        top_start = time.time()
+        top = big_grid.top_k(k)
+        top_time = time.time() - top_start
+        assert top['words'] == big_full['words'][:k]
+        print(f'40x40 top_k({k}): {top["explored"]} of {big_full["explored"]} nodes, '
+              f'{top_time:.4f}s vs {full_time:.4f}s for the full ranking')
+
+    index_start = time.time()
+    big_grid.index_words()
+    print(f'Indexed 40x40 board in {time.time() - index_start}')
+    for r, c in [(0, 0), (20, 20), (39, 5)]:
+        edit_start = time.time()
+        old_words = set(big_grid.word_paths)
+        added, removed = big_grid.set_cell(r, c, 'e')
+        edit_time = time.time() - edit_start
+        big_rows[r][c] = 'e'
+        new_words = Grid(big_rows, shared_trie).find_words()
+        assert set(big_grid.word_paths) == new_words
+        assert added == new_words - old_words and removed == old_words - new_words
+        print(f'set_cell({r}, {c}) took {edit_time}: +{len(added)} -{len(removed)} words')
+    for r, c in [(0, 40), (-1, 0), (40, 0)]:
+        try:
+            big_grid.set_cell(r, c, 'e')
+        except IndexError:
+            pass
+        else:
+            raise AssertionError(f'set_cell({r}, {c}) edited a cell outside the board')
+
+    # Rectangular boards are flattened with r * C + c, so the solver agrees with itself under transposition
+    wide = [['r', 'a', 'e', 'l', 'm', 'o'], ['f', 's', 't', 'e', 'o', 'k']]
+    tall = [list(col) for col in zip(*wide)]
+    assert Grid(wide, shared_trie).find_words() == Grid(tall, shared_trie).find_words()
+
+    # Single row boards leave paths with no unvisited neighbor; the breadth-first search must stop there too
+    line_trie = build_trie(['cat', 'cats', 'act', 'sat', 'tac'])
+    for line in (['c', 'a', 't'], ['c', 'a', 't', 's']):
+        line_grid = Grid([line], line_trie)
+        line_words = line_grid.find_words()
+        assert set().union(*(line_grid.full_search(i) for i in range(len(line)))) == line_words
+        assert set().union(*(line_grid.full_search(i, SearchStats()) for i in range(len(line)))) == line_words
+    assert line_words == {'cat', 'cats', 'tac'}
+
     all_words = list(all_words)
     print_words = all_words if len(all_words) < 20 else all_words[:20]
     print('\n\n', print_words)
@@ -0,0 +1,289 @@
+"""
+Prebuilt dictionary index which is compiled once and memory-mapped at startup.
+
+Both word finder scripts re-read english_words.txt on every run, deduplicate it and insert every word into a
+fresh Trie. build_index compiles a word list into the ArrayTrie layout and writes it to a binary file once;
+MappedTrie then mmaps that file and searches the child table in place, so a cold process can answer
+queries without parsing any text.
+
+File layout (native byte order, recorded in the header):
+
+    header:    magic b'WTRI', format version, byte order, n_alpha, n_nodes, alphabet length, crc32
+    alphabet:  utf-8 letters in index order, padded to a multiple of 4 bytes
+    children:  int32 child table of n_nodes * n_alpha entries (0 is the null pointer)
+    terminal:  bitset with one bit per node marking the end of a valid word
+
+The crc32 checksum covers everything after the header.
+"""
+import mmap
+import os
+import struct
+import sys
+import typing as t
+import zlib
+
+from array_trie import ArrayTrie
+
+MAGIC = b'WTRI'
+VERSION = 1
+HEADER = struct.Struct('<4sHcxIIII')  # magic, version, byte order, pad, n_alpha, n_nodes, alpha bytes, crc32
+
+
+def build_index(words: t.Iterable[str], path: str) -> int:
+    """
+    Compile a word list into a binary trie index file.
+
+    The alphabet is taken from the words themselves so the index can serve any board; boards restrict it at
+    search time rather than requiring a rebuild.
+
+    Args:
+        words: words to include in the index (duplicates are ignored)
+        path: destination file for the compiled index
+
+    Returns:
+        number of bytes written
+
+    """
+    words = sorted(set(words))
+    alphabet = {l: i for i, l in enumerate(sorted(set(''.join(words))))}
+    trie = ArrayTrie(alphabet)
+    for word in words:
+        trie.insert(word)
+
+    alpha_bytes = ''.join(alphabet).encode('utf-8')
+    alpha_bytes += bytes(-len(alpha_bytes) % 4)  # keep the child table 4-byte aligned
+    payload = alpha_bytes + trie.children.tobytes() + bytes(trie.terminal)
+    header = HEADER.pack(MAGIC, VERSION, sys.byteorder[0].encode(), trie.n_alpha, trie.n_nodes,
+                         len(''.join(alphabet).encode('utf-8')), zlib.crc32(payload))
+    with open(path, 'wb') as f:
+        f.write(header)
+        f.write(payload)
+    return HEADER.size + len(payload)
+
+
+class MappedTrie(object):
+    """Read-only trie searched in place from a memory-mapped index file built by build_index."""
+    def __init__(self, path: str, verify: bool = True):
+        """
+        Map the index file and expose its child table and terminal bitset as zero-copy views.
+
+        Args:
+            path: index file written by build_index
+            verify: check the payload against the stored crc32 checksum (one pass over the file)
+
+        Raises:
+            ValueError: if the file is not an index, was written by another format version or byte order,
+                        or fails its checksum.
+
+        """
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._load(verify)
+        except ValueError:
+            self.close()
+            raise
+
+    def _load(self, verify: bool):
+        # release the whole-file view on every path, otherwise close() cannot unmap after a failed load
+        with memoryview(self._mmap) as buf:
+            self._parse(buf, verify)
+
+    def _parse(self, buf: memoryview, verify: bool):
+        if len(buf) < HEADER.size:
+            raise ValueError('File is too small to be a trie index')
+        magic, version, order, n_alpha, n_nodes, alpha_len, crc = HEADER.unpack_from(buf)
+        if magic != MAGIC:
+            raise ValueError('File is not a trie index')
+        if version != VERSION:
+            raise ValueError(f'Unsupported trie index version {version} (expected {VERSION})')
+        if order != sys.byteorder[0].encode():
+            raise ValueError('Trie index was written with a different byte order')
+        if verify and zlib.crc32(buf[HEADER.size:]) != crc:
+            raise ValueError('Trie index failed checksum verification')
+
+        offset = HEADER.size
+        letters = bytes(buf[offset:offset + alpha_len]).decode('utf-8')
+        offset += alpha_len + (-alpha_len % 4)
+        self.alphabet = {l: i for i, l in enumerate(letters)}
+        self.n_alpha = n_alpha
+        self.n_nodes = n_nodes
+        self.children = buf[offset:offset + 4 * n_alpha * n_nodes].cast('i')
+        offset += 4 * n_alpha * n_nodes
+        self.terminal = buf[offset:offset + (n_nodes + 7) // 8]
+
+    def close(self):
+        """Release the views and unmap the file."""
+        for view in ('children', 'terminal'):
+            if hasattr(self, view):
+                getattr(self, view).release()
+                delattr(self, view)
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def is_word(self, node: int) -> bool:
+        """Check the terminal bit of a node."""
+        return bool(self.terminal[node >> 3] >> (node & 7) & 1)
+
+    def search(self, key: str, letters: t.Optional[t.Collection[str]] = None) -> t.Tuple[bool, bool]:
+        """
+        Search the index to determine if a key is a valid word or the prefix of some valid word.
+
+        Args:
+            key: prefix to search for (may be full word or substring)
+            letters: optional board letters; when given, continuations through other letters are ignored
+                     so the result matches a Trie built from the filtered dictionary
+
+        Raises:
+            ValueError: if word contains letters which are not part of available alphabet.
+
+        Returns:
+            key is valid word, key is prefix to other valid words
+
+        """
+        if not set(key).issubset(self.alphabet if letters is None else letters):
+            raise ValueError(f'{key} contains characters which are not in available alphabet')
+        children, n_alpha, alphabet = self.children, self.n_alpha, self.alphabet
+        node = 0  # current node in index
+        for letter in key:  # traverse word one char at a time
+            char = alphabet.get(letter)
+            if char is None:
+                return False, False  # letter never appears in the dictionary
+            node = children[node * n_alpha + char]
+            if not node:
+                return False, False  # branch dies before end of key
+        row = node * n_alpha
+        if letters is None:
+            return self.is_word(node), any(children[row:row + n_alpha])
+        return self.is_word(node), self._has_word_below(node, self._allowed(letters))
+
+    def _allowed(self, letters: t.Collection[str]) -> t.List[int]:
+        return sorted(self.alphabet[l] for l in set(letters) if l in self.alphabet)
+
+    def _has_word_below(self, node: int, allowed: t.List[int]) -> bool:
+        """Check if any word spelled only with allowed letters continues below node."""
+        children, row = self.children, node * self.n_alpha
+        stack = [children[row + c] for c in allowed if children[row + c]]
+        while stack:
+            node = stack.pop()
+            if self.is_word(node):
+                return True
+            row = node * self.n_alpha
+            stack.extend(children[row + c] for c in allowed if children[row + c])
+        return False
+
+    def words(self, letters: t.Optional[t.Collection[str]] = None,
+              max_len: t.Optional[int] = None) -> t.Iterator[str]:
+        """
+        Iterate the words in the index, optionally filtered for a particular board.
+
+        This replaces the per-board `set(word).difference(alpha) or len(word) > N_CELLS` filter: only
+        branches for the board's letters are walked, so no rebuild is required.
+
+        Args:
+            letters: letters available on the board (all letters when None)
+            max_len: longest word to yield, usually the number of cells on the board
+
+        Returns:
+            iterator of words in alphabetical order of the index
+
+        """
+        codes = range(self.n_alpha) if letters is None else self._allowed(letters)
+        chars = list(self.alphabet)
+        children, n_alpha = self.children, self.n_alpha
+        stack = [(0, '')]
+        while stack:
+            node, prefix = stack.pop()
+            if node and self.is_word(node):
+                yield prefix
+            if max_len is not None and len(prefix) >= max_len:
+                continue
+            row = node * n_alpha
+            stack.extend((children[row + c], prefix + chars[c]) for c in reversed(codes) if children[row + c])
+
+
+def load_index(words_path: str, index_path: str, verify: bool = True) -> MappedTrie:
+    """
+    Open the prebuilt index for a word list, compiling it first if it is missing or older than the list.
+
+    Args:
+        words_path: newline separated word list the index is built from
+        index_path: location of the compiled index
+        verify: check the payload against the stored crc32 checksum
+
+    Returns:
+        MappedTrie over the index (use as a context manager or call close() when done)
+
+    """
+    if not os.path.exists(index_path) or os.path.getmtime(index_path) < os.path.getmtime(words_path):
+        with open(words_path) as f:
+            build_index(f.read().splitlines(), index_path)
+    return MappedTrie(index_path, verify)
+
+
+if __name__ == '__main__':
+    import shutil
+    import tempfile
+    import time
+
+    from trie_driven_graph import Trie
+
+    WORDS = '../data/english_words.txt'
+    INDEX = '../data/english_words.trie'
+
+    # Build step: only recompile when the word list is newer than the index
+    start_time = time.time()
+    load_index(WORDS, INDEX).close()
+    print(f'Index ready ({os.path.getsize(INDEX)} bytes) in {time.time() - start_time:.4f}s')
+
+    # A corrupted index is rejected by its checksum and the mapping is released
+    with tempfile.TemporaryDirectory() as tmp:
+        corrupt = os.path.join(tmp, 'corrupt.trie')
+        shutil.copyfile(INDEX, corrupt)
+        with open(corrupt, 'r+b') as f:
+            f.seek(HEADER.size + 1)
+            byte = f.read(1)
+            f.seek(HEADER.size + 1)
+            f.write(bytes([byte[0] ^ 0xFF]))
+        try:
+            MappedTrie(corrupt)
+        except ValueError as e:
+            assert 'checksum' in str(e)
+        else:
+            raise AssertionError('corrupted index was accepted')
+
+    ROWS = [
+        ['r', 'a', 'e', 'l'],
+        ['m', 'o', 'f', 's'],
+        ['t', 'e', 'o', 'k'],
+        ['n', 'a', 't', 'i'],
+    ]
+    alpha = set(l for row in ROWS for l in row)
+    N_CELLS = len(ROWS) * len(ROWS[0])
+
+    # Cold path used by the scripts today: parse text, filter, build Trie
+    start_time = time.time()
+    with open(WORDS) as f:
+        filtered = {w for w in set(f.read().splitlines()) if not set(w).difference(alpha) and len(w) <= N_CELLS}
+    text_trie = Trie({l: i for i, l in enumerate(alpha)})
+    for word in filtered:
+        text_trie.insert(word)
+    text_time = time.time() - start_time
+
+    # Cold path from the prebuilt index: map, verify and filter in place
+    start_time = time.time()
+    with MappedTrie(INDEX) as index:
+        load_time = time.time() - start_time
+        mapped_filtered = set(index.words(alpha, N_CELLS))
+        filter_time = time.time() - start_time - load_time
+        assert mapped_filtered == filtered
+        for key in ['foo', 'mea', 'self', 'kkk', 'atom', 'fo']:
+            assert index.search(key, alpha) == text_trie.search(key), key
+
+    print(f'Text parse + filter + Trie build: {text_time:.4f}s')
+    print(f'Index mmap + checksum: {load_time:.4f}s, board filter ({len(mapped_filtered)} words): {filter_time:.4f}s')
@@ -0,0 +1,201 @@
+"""
+Dictionary-driven word finder: check each dictionary word for presence on the board.
+
+The grid-driven solvers in trie_driven_graph walk every board path and consult the dictionary as they go, which
+is wasteful when the dictionary is small and the board is huge. WordDrivenGrid instead indexes the cells holding
+each letter and, for every word, backtracks from the cells holding its first letter through neighbors holding
+the following letters, stopping at the first complete path. Words needing more copies of a letter than the board
+has are rejected from the letter histogram without any search.
+
+choose_strategy estimates the cost of both approaches from the board size, letter histogram and dictionary, and
+solve dispatches to the cheaper one; both return identical word sets.
+"""
+from collections import Counter
+import random
+import typing as t
+import time
+
+from grid_graph import NeighborTable
+from trie_driven_graph import Grid, Trie, build_trie
+
+# Relative costs (in units of one path extension) calibrated with the benchmark in __main__
+WORD_OVERHEAD = 2.0  # histogram check and bookkeeping per dictionary word
+CELL_OVERHEAD = 6.0  # grid setup and root step per board cell
+TRIE_INSERT = 1.5  # building the trie, per dictionary letter, when no prebuilt trie is supplied
+PREFIX_SHARING = 0.5  # fraction of word prefixes which are distinct trie nodes
+SAMPLE_SIZE = 256  # dictionary words sampled by the cost model
+
+
+class WordDrivenGrid:
+    def __init__(self, rows: t.List[t.List[str]]):
+        # Keep dimensions of grid and then flatten letter array
+        self.R = len(rows)
+        self.C = len(rows[0])
+        self.letters = []
+        for row in rows:
+            if len(row) != self.C:
+                raise ValueError('All rows of the grid must have the same number of columns')
+            self.letters.extend(row)  # flatten row by row, so cell (r, c) has index r * C + c
+        self.graph = NeighborTable(self.R, self.C)
+        self.histogram = Counter(self.letters)
+        self.positions: t.Dict[str, t.List[int]] = {}  # letter -> cells holding that letter
+        for i, letter in enumerate(self.letters):
+            self.positions.setdefault(letter, []).append(i)
+
+    def find_path(self, word: str) -> t.Optional[t.Tuple[int, ...]]:
+        """
+        Find one path of adjacent, distinct cells spelling word.
+
+        Args:
+            word: word to look for
+
+        Returns:
+            tuple of flat cell indices spelling the word, or None if the board cannot spell it
+
+        """
+        if not word or len(word) > len(self.letters):
+            return None
+        for letter, needed in Counter(word).items():
+            if self.histogram[letter] < needed:
+                return None  # board does not hold enough copies of this letter
+        letters, offsets, adjacent = self.letters, self.graph.offsets, self.graph.cells
+        visited = bytearray(len(letters))
+        path = []
+
+        def extend(cell: int) -> bool:
+            path.append(cell)
+            if len(path) == len(word):
+                return True
+            visited[cell] = 1
+            wanted = word[len(path)]
+            for k in range(offsets[cell], offsets[cell + 1]):
+                nxt = adjacent[k]
+                if letters[nxt] == wanted and not visited[nxt] and extend(nxt):
+                    return True
+            visited[cell] = 0
+            path.pop()
+            return False
+
+        for start in self.positions.get(word[0], ()):
+            if extend(start):
+                return tuple(path)
+        return None
+
+    def find_words(self, dictionary: t.Iterable[str], min_len: int = 3) -> set:
+        """
+        Find every dictionary word which can be spelled on the board.
+
+        Args:
+            dictionary: words to look for
+            min_len: shortest word to report
+
+        Returns:
+            set of valid words found anywhere in the grid
+
+        """
+        return {word for word in dictionary if len(word) >= min_len and self.find_path(word) is not None}
+
+
+def _expected_extensions(word: str, histogram: Counter, n_cells: int, branching: float) -> t.List[float]:
+    """
+    Expected number of board paths spelling each prefix of word, for a board with random letter placement.
+
+    A path starts on any cell holding the first letter and each further letter is found among the ~branching
+    neighbors with probability equal to that letter's share of the board.
+    """
+    expected, paths = [], 0.0
+    for i, letter in enumerate(word):
+        share = histogram.get(letter, 0) / n_cells
+        paths = n_cells * share if i == 0 else paths * branching * share
+        if paths < 1e-3:
+            break
+        expected.append(paths)
+    return expected
+
+
+def choose_strategy(rows: t.List[t.List[str]], dictionary: t.Collection[str],
+                    trie: t.Optional[Trie] = None) -> t.Tuple[str, t.Dict[str, float]]:
+    """
+    Pick the cheaper of grid-driven and word-driven search for a board and dictionary.
+
+    Both costs are estimated in path extensions from a sample of the dictionary: word-driven search pays a
+    fixed check per word plus the expected partial matches of each word, while grid-driven search pays per
+    board cell, per distinct dictionary prefix reachable on the board and, without a prebuilt trie, for
+    inserting every dictionary letter.
+
+    Args:
+        rows: letters arranged in columns and rows
+        dictionary: words to look for
+        trie: prebuilt Trie for the dictionary, if one is available to the grid-driven search
+
+    Returns:
+        'grid' or 'word', and the estimated cost of each
+
+    """
+    letters = [l for row in rows for l in row]
+    n_cells, histogram = len(letters), Counter(letters)
+    branching = 8 * (len(rows) - 1) * (len(rows[0]) - 1) / n_cells if n_cells > 1 else 0  # mean degree, approx.
+    words = list(dictionary)
+    sample = words if len(words) <= SAMPLE_SIZE else random.Random(0).sample(words, SAMPLE_SIZE)
+    scale = len(words) / len(sample) if sample else 0
+
+    extensions = sum(sum(_expected_extensions(w, histogram, n_cells, branching)) for w in sample) * scale
+    letters_total = sum(len(w) for w in sample) * scale
+    word_cost = WORD_OVERHEAD * len(words) + extensions
+    grid_cost = CELL_OVERHEAD * n_cells + PREFIX_SHARING * extensions
+    if trie is None:
+        grid_cost += TRIE_INSERT * letters_total
+    return ('word' if word_cost < grid_cost else 'grid'), {'word': word_cost, 'grid': grid_cost}
+
+
+def solve(rows: t.List[t.List[str]], dictionary: t.Collection[str], strategy: str = 'auto',
+          trie: t.Optional[Trie] = None) -> set:
+    """
+    Find all dictionary words on a board using grid-driven or word-driven search.
+
+    Args:
+        rows: letters arranged in columns and rows
+        dictionary: words to look for
+        strategy: 'grid', 'word' or 'auto' to let choose_strategy decide
+        trie: prebuilt Trie for the dictionary, reused by grid-driven search instead of building one
+
+    Returns:
+        set of valid words (3 or more letters) found anywhere in the grid
+
+    Raises:
+        ValueError: if strategy is not one of the above
+
+    """
+    if strategy == 'auto':
+        strategy = choose_strategy(rows, dictionary, trie)[0]
+    if strategy == 'grid':
+        return Grid(rows, trie or build_trie(dictionary)).find_words()
+    if strategy == 'word':
+        return WordDrivenGrid(rows).find_words(dictionary)
+    raise ValueError(f'Unknown strategy {strategy}')
+
+
+if __name__ == '__main__':
+    # read in sample dictionary - taken from https://www.mit.edu/~ecprice/wordlist.10000
+    with open('../data/english_words.txt') as f:
+        word_dictionary = sorted(set(f.read().splitlines()))
+    letter_pool = ''.join(word_dictionary)
+    rng = random.Random(0)
+
+    def timed(fn):
+        start = time.perf_counter()
+        result = fn()
+        return result, time.perf_counter() - start
+
+    print(f'{"board":>9}{"words":>7}{"grid (ms)":>11}{"word (ms)":>11}{"faster":>8}{"chosen":>8}{"auto (ms)":>11}')
+    for size in [4, 16, 64, 256]:
+        rows = [rng.choices(letter_pool, k=size) for _ in range(size)]
+        for n_words in [10, 100, 1000, 10000]:
+            words = rng.sample(word_dictionary, n_words)
+            grid_words, grid_time = timed(lambda: solve(rows, words, 'grid'))
+            word_words, word_time = timed(lambda: solve(rows, words, 'word'))
+            assert grid_words == word_words
+            chosen = choose_strategy(rows, words)[0]
+            _, auto_time = timed(lambda: solve(rows, words))
+            print(f'{f"{size}x{size}":>9}{n_words:>7}{grid_time * 1000:>11.2f}{word_time * 1000:>11.2f}'
+                  f'{"grid" if grid_time < word_time else "word":>8}{chosen:>8}{auto_time * 1000:>11.2f}')
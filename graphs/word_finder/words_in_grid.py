@@ -4,10 +4,14 @@ Words must be 3 or more letters.
 You may move to any of 8 adjacent letters, however, a word should not have multiple instances of the same cell.
 To check if a string is a valid word you may implement a naive dictionary solution for simplicity.
 """
-from collections import defaultdict, deque
+from collections import deque
 import typing as t
 import time
 
+from grid_graph import NeighborTable, SearchStats
+from signature_index import SignatureIndex
+from trie_index import load_index
+
 
 class Grid:
     def __init__(self, rows: list):
@@ -16,19 +20,15 @@ class Grid:
         self.C = len(rows[0])
         self.letters = []
         self.dictionary = set()  # will set the available dictionary of words later
-        self.graph = defaultdict(list)  # key for each letter index with list of neighbors as value
-
-        for r, row in enumerate(rows):
-            for c, letter in enumerate(row):
-                i = r * self.R + c  # convert row,column to flat index
-                self.letters.append(letter)  # add cell contents to flattened list
-                neighbors = [x * self.R + y for x in range(r - 1, r + 2)  # adjacent rows
-                             for y in range(c - 1, c + 2)  # adjacent columns
-                             if 0 <= x < self.R  # avoid x-boundary
-                             and 0 <= y < self.C]  # avoid y-boundary
-                self.graph[i] = [c for c in neighbors if c != i]  # omit self from neighbors
-
-    def full_search(self, start: int):
+        for row in rows:
+            if len(row) != self.C:
+                raise ValueError('All rows of the grid must have the same number of columns')
+            self.letters.extend(row)  # flatten row by row, so cell (r, c) has index r * C + c
+        self.graph = NeighborTable(self.R, self.C)  # indexable by cell for array of neighbor indices
+
+    def full_search(self, start: int, stats: t.Optional[SearchStats] = None):
+        if stats is not None:
+            return self._full_search_stats(start, stats)
         i = 0
         paths = deque([[start]])
         found_words = set()
@@ -41,6 +41,23 @@ class Grid:
             # if i > 999999: return found_words
         return found_words
 
+    def _full_search_stats(self, start: int, stats: SearchStats):
+        # instrumented copy of full_search, kept separate so the plain loop pays nothing for counting
+        began = time.perf_counter()
+        paths = deque([[start]])
+        found_words = set()
+        while paths:
+            stats.peak_frontier = max(stats.peak_frontier, len(paths))
+            path = paths.popleft()
+            stats.paths_expanded += 1
+            new_words, next_paths = self.search(path)
+            for word in new_words:
+                stats.words_by_depth[len(word)] += 1
+            found_words = found_words.union(new_words)
+            paths.extend(next_paths)
+        stats.cell_times[start] = stats.cell_times.get(start, 0) + time.perf_counter() - began
+        return found_words
+
     def search(self, path: t.List[int]):
         # print(f'starting with {word}')
         # get all possible neighbor indices (unused in current word)
@@ -76,17 +93,15 @@ if __name__ == '__main__':
     N_CELLS = len([l for row in ROWS for l in row])  # max word length
     ROWS = [[l.lower() for l in row] for row in ROWS]  # ensure lowercase for word-matching
 
-    # read in sample dictionary - taken from https://www.mit.edu/~ecprice/wordlist.10000
-    with open('../data/english_words.txt') as f:
-        word_dictionary = f.read().splitlines()
-    word_dictionary = set(word_dictionary)  # ensure no duplicate words passed in dict
-
     alpha = set(l for row in ROWS for l in row)  # get unique letters in grid
-    filtered_dictionary = set()  # keep track of words after filtering for available chars
-    for word in word_dictionary:
-        if set(word).difference(alpha) or len(word) > N_CELLS:
-            continue  # skip words which are not subset of available alphabet or longer than grid
-        filtered_dictionary.add(word)
+
+    # load sample dictionary - taken from https://www.mit.edu/~ecprice/wordlist.10000
+    # from the prebuilt index (compiled on first run), keeping only words of the grid's letters and size
+    with load_index('../data/english_words.txt', '../data/english_words.trie') as index:
+        word_dictionary = set(index.words(alpha, N_CELLS))
+
+    # keep only words spelled with the grid's letters (no more copies than the grid holds) and no longer than grid
+    filtered_dictionary = set(SignatureIndex(word_dictionary).filter(l for row in ROWS for l in row))
 
     print('Available Letters:', alpha)
     print(f'Filtered Dictionary has {len(filtered_dictionary)} words')
@@ -95,9 +110,9 @@ if __name__ == '__main__':
     grid.set_dict(filtered_dictionary)
 
     # Examine grid construction
-    print(grid.graph[0])
-    print(grid.graph[3])
-    print(grid.graph[5])
+    print(list(grid.graph[0]))
+    print(list(grid.graph[3]))
+    print(list(grid.graph[5]))
     print(grid.search([0, 5]))
 
     all_words = set()
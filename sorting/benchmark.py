@@ -0,0 +1,291 @@
+"""
+Headless, reproducible benchmark suite for the algorithms in my_sort.
+
+Every algorithm is run against seeded input distributions (random, sorted,
+reversed, few unique values and dict records sorted by a key) at each size.
+Each measurement is timed with perf_counter_ns over a number of repeats after
+warmup runs, with garbage collection disabled while timing, and optionally
+profiled once more under tracemalloc for its peak memory. The algorithms'
+own counters (compares, merges, passes...) are recorded from the run as
+well. Algorithms are skipped at sizes beyond their limit (bubble sort stops
+at a few thousand elements).
+
+Results are written as JSON. Given a baseline file from an earlier run, each
+measurement is compared with the matching one in the baseline and the
+benchmark exits with status 1 if any median time regressed by more than the
+threshold (and by more than timer noise), so it can gate CI.
+
+Examples:
+    python benchmark.py --sizes 1000 10000 --output baseline.json
+    python benchmark.py --sizes 1000 10000 --baseline baseline.json --output current.json
+    python benchmark.py --algorithms radix_sort my_sort time_base --sizes 1000000 10000000
+"""
+
+import argparse
+import datetime
+import gc
+import json
+import operator
+import platform
+import random
+import statistics
+import string
+import sys
+import time
+import tracemalloc
+
+from my_sort import (bubble_sort, counting_sort, external_sort, merge_sort, my_sort, natural_merge_sort,
+                     parallel_merge_sort, radix_sort, time_base)
+
+
+def _run_external_sort(x, *, key=None, reverse=False):
+    """Run external_sort on a stream of x, consuming its sorted generator."""
+    result = external_sort(iter(x), key=key, reverse=reverse, memory_limit=8 * 2 ** 20)
+    result['sorted'] = list(result['sorted'])
+    return result
+
+
+# name -> (sort function, largest input size it is benchmarked at)
+ALGORITHMS = {
+    'bubble_sort': (bubble_sort, 5000),
+    'merge_sort': (merge_sort, 10 ** 6),
+    'natural_merge_sort': (natural_merge_sort, 10 ** 7),
+    'external_sort': (_run_external_sort, 10 ** 7),
+    'parallel_merge_sort': (parallel_merge_sort, 10 ** 7),
+    'counting_sort': (counting_sort, 10 ** 7),
+    'radix_sort': (radix_sort, 10 ** 7),
+    'my_sort': (my_sort, 10 ** 7),
+    'time_base': (time_base, 10 ** 7),
+}
+
+
+def _random(rng, n):
+    return [rng.random() for _ in range(n)], None
+
+
+def _sorted(rng, n):
+    return list(range(n)), None
+
+
+def _reversed(rng, n):
+    return list(range(n, 0, -1)), None
+
+
+def _few_unique(rng, n):
+    return [rng.randrange(10) for _ in range(n)], None
+
+
+def _records(rng, n):
+    records = [{
+        'id': i,
+        'name': ''.join(rng.choices(string.ascii_lowercase, k=8)),
+        'score': rng.randrange(100),
+    } for i in range(n)]
+    return records, operator.itemgetter('score')
+
+
+# name -> function(rng, n) returning (input list, key function or None)
+DISTRIBUTIONS = {
+    'random': _random,
+    'sorted': _sorted,
+    'reversed': _reversed,
+    'few_unique': _few_unique,
+    'records': _records,
+}
+
+
+def make_input(distribution, n, seed):
+    """
+    Generate the input for a distribution and size, identical on every run with the same seed.
+
+    Returns:
+        tuple: (input list, key function or None)
+    """
+    rng = random.Random('{}:{}:{}'.format(seed, distribution, n))
+    return DISTRIBUTIONS[distribution](rng, n)
+
+
+def measure(sort, x, key, repeat, warmup, memory):
+    """
+    Time one algorithm on one input.
+
+    Args:
+        sort (function): sort function taking (x, key=key) and returning a
+            result dict
+        x (list): input to sort, left unchanged
+        key (function): key function, or None
+        repeat (int): timed runs
+        warmup (int): untimed runs before the timed ones
+        memory (bool): run once more under tracemalloc to find peak memory
+
+    Returns:
+        dict: representation of results
+            times_ns: wall time of each timed run (in nanoseconds)
+            counters: the counters reported by the last run (everything in
+                its result but the sorted list and its own timing)
+            peak_bytes: peak memory allocated during one run, or None
+            sorted: the output of the last run, for checking
+
+    """
+    if repeat < 1:
+        raise ValueError('repeat must be at least 1, got {}'.format(repeat))
+    for _ in range(warmup):
+        sort(x, key=key)
+
+    times = []
+    gc_enabled = gc.isenabled()
+    try:
+        for _ in range(repeat):
+            gc.collect()
+            gc.disable()
+            start = time.perf_counter_ns()
+            result = sort(x, key=key)
+            times.append(time.perf_counter_ns() - start)
+            gc.enable()
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    peak_bytes = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        sort(x, key=key)
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    counters = {name: value for name, value in result.items() if name not in ('sorted', 'time')}
+    return {'times_ns': times, 'counters': counters, 'peak_bytes': peak_bytes, 'sorted': result['sorted']}
+
+
+def run(algorithms, distributions, sizes, repeat=5, warmup=1, memory=False, seed=0, log=print):
+    """
+    Benchmark every algorithm on every distribution and size.
+
+    Returns:
+        dict: JSON-ready report with 'meta' describing the run and 'results',
+            one entry per (algorithm, distribution, size) with min, median,
+            mean and standard deviation of the times in nanoseconds
+    """
+    results = []
+    for size in sizes:
+        for distribution in distributions:
+            x, key = make_input(distribution, size, seed)
+            expected = sorted(x, key=key)
+            for name in algorithms:
+                sort, max_size = ALGORITHMS[name]
+                if size > max_size:
+                    continue
+                measured = measure(sort, x, key, repeat, warmup, memory)
+                # every algorithm must agree with sorted(), stability included
+                if list(measured.pop('sorted')) != expected:
+                    raise AssertionError('{} sorted {} {} incorrectly'.format(name, size, distribution))
+                times = measured.pop('times_ns')
+                entry = {
+                    'algorithm': name,
+                    'distribution': distribution,
+                    'size': size,
+                    'repeat': repeat,
+                    'min_ns': min(times),
+                    'median_ns': statistics.median(times),
+                    'mean_ns': statistics.mean(times),
+                    'stdev_ns': statistics.stdev(times) if len(times) > 1 else 0.0,
+                }
+                entry.update(measured)
+                results.append(entry)
+                log('{:<20}{:<12}{:>10}{:>14.3f} ms{}'.format(
+                    name, distribution, size, entry['median_ns'] / 1e6,
+                    '' if entry['peak_bytes'] is None else '{:>12.1f} MB'.format(entry['peak_bytes'] / 1e6)))
+            del x, expected
+
+    return {
+        'meta': {
+            'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'python': sys.version,
+            'platform': platform.platform(),
+            'seed': seed,
+            'repeat': repeat,
+            'warmup': warmup,
+        },
+        'results': results,
+    }
+
+
+def compare(report, baseline, threshold=0.1, min_delta_ns=500000):
+    """
+    Compare the median times of a report with a baseline report.
+
+    Args:
+        report (dict): report returned by run()
+        baseline (dict): earlier report, e.g. loaded from JSON
+        threshold (float): relative slowdown of the median above which a
+            measurement counts as a regression (0.1 is 10% slower)
+        min_delta_ns (int): slowdowns smaller than this are timer noise and
+            never count as regressions
+
+    Returns:
+        list: (algorithm, distribution, size, baseline median ns, median ns,
+            ratio) for every measurement present in both, slowest ratio first
+        list: the subset of those whose ratio exceeds 1 + threshold
+
+    """
+    previous = {(r['algorithm'], r['distribution'], r['size']): r for r in baseline['results']}
+    changes = []
+    for result in report['results']:
+        old = previous.get((result['algorithm'], result['distribution'], result['size']))
+        if old is None:
+            continue
+        ratio = result['median_ns'] / old['median_ns'] if old['median_ns'] else float('inf')
+        changes.append((result['algorithm'], result['distribution'], result['size'],
+                        old['median_ns'], result['median_ns'], ratio))
+    changes.sort(key=lambda change: -change[5])
+    regressions = [change for change in changes
+                   if change[5] > 1 + threshold and change[4] - change[3] > min_delta_ns]
+    return changes, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--algorithms', nargs='+', default=list(ALGORITHMS), choices=list(ALGORITHMS))
+    parser.add_argument('--distributions', nargs='+', default=list(DISTRIBUTIONS), choices=list(DISTRIBUTIONS))
+    parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per measurement')
+    parser.add_argument('--warmup', type=int, default=1, help='untimed runs before timing')
+    parser.add_argument('--memory', action='store_true', help='also record peak memory with tracemalloc')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the generated inputs')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='relative slowdown of a median time reported as a regression')
+    parser.add_argument('--min-delta-ms', type=float, default=0.5,
+                        help='slowdowns smaller than this are never reported as regressions')
+    args = parser.parse_args(argv)
+    if args.repeat < 1:
+        parser.error('--repeat must be at least 1')
+
+    report = run(args.algorithms, args.distributions, sorted(args.sizes), repeat=args.repeat,
+                 warmup=args.warmup, memory=args.memory, seed=args.seed)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        changes, regressions = compare(report, baseline, args.threshold, args.min_delta_ms * 1e6)
+        print('{:<20}{:<12}{:>10}{:>16}{:>16}{:>8}'.format(
+            'Algorithm', 'Input', 'Size', 'baseline (ms)', 'current (ms)', 'ratio'))
+        for change in changes:
+            name, distribution, size, old, new, ratio = change
+            flag = '  REGRESSION' if change in regressions else ''
+            print('{:<20}{:<12}{:>10}{:>16.3f}{:>16.3f}{:>8.2f}{}'.format(
+                name, distribution, size, old / 1e6, new / 1e6, ratio, flag))
+        if regressions:
+            print('{} of {} measurements regressed by more than {:.0%}'.format(
+                len(regressions), len(changes), args.threshold))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,13 +3,49 @@ my_sort is a custom implementation of python's built-in sorted() function.
 
 my_sort operates exactly the same as the base version, accepts an iterable as
 input to be sorted, an optional key by which to perform sorting, and a
-reversed flag to control direction of sort. Within my_sort, both bubble_sort()
-and merge_sort() implementations are available
+reversed flag to control direction of sort. It samples the input and hands it
+to whichever of the algorithms below suits it best. Within my_sort, bubble_sort(),
+merge_sort() and natural_merge_sort() implementations are available, as well as
+external_sort() for streams too large to hold in memory,
+parallel_merge_sort() which sorts chunks in several processes, and
+counting_sort() and radix_sort() which never compare keys at all. When only
+the first few elements are needed, top_k() and partial_sort() select them
+without sorting the rest, and SortedList keeps a sequence sorted as elements
+are added.
+
+Like sorted(), the key function is called exactly once per element: keys are
+computed up front into an array parallel to the elements (decorate), the sort
+compares only those keys, and the elements are read back in sorted order
+(undecorate). Every sort is stable, in either direction.
+
+bubble_sort() and merge_sort() accept an observer (see SortObserver) which is
+notified of every comparison, swap and merge; without one they run loops with
+no instrumentation at all.
 """
 
+from array import array
+import bisect
+import heapq
+import itertools
+import multiprocessing
+from multiprocessing import shared_memory
+import numbers
+import operator
+import os
+import pickle
+import shutil
+import struct
+import sys
+import tempfile
 import time
+import weakref
 import logging
 
+try:
+    import numpy as np
+except ImportError:  # radix_sort falls back to counting or merge sorts
+    np = None
+
 # Logger used to debug function internals
 LOGGER = logging.getLogger(__name__)
 # Limit the messages created by logger according to severity
@@ -19,8 +55,143 @@ ch = logging.StreamHandler()
 ch.setLevel(logging.DEBUG)
 LOGGER.addHandler(ch)
 
+# Consecutive wins by one run after which a merge switches to galloping
+MIN_GALLOP = 7
+# Most elements pickled together as one block of an external_sort run file
+RUN_BLOCK = 4096
+# Smallest input parallel_merge_sort splits across processes
+PARALLEL_THRESHOLD = 20000
+# Bits of the key sorted by each pass of the LSD radix sort
+RADIX_BITS = 16
+# Buckets at most this size are finished by natural merge sort in MSD radix sort
+MSD_CUTOFF = 32
+# Bytes moved per element of a python list (one reference)
+POINTER_SIZE = struct.calcsize('P')
+# Adjacent pairs of keys my_sort inspects to choose a strategy
+SAMPLE_SIZE = 256
+# Inputs shorter than this are sorted by binary insertion in my_sort
+INSERTION_THRESHOLD = 64
+# Inputs at least this long are sorted in parallel by my_sort when there are several CPUs
+MY_SORT_PARALLEL = 500000
+# A batch merged into a SortedList is inserted element by element when the list is this many times longer
+INSERT_RATIO = 4
+
 
-def bubble_sort(x, *, key=None, reverse=False):
+class SortObserver(object):
+    """
+    Instrumentation hooks for bubble_sort and merge_sort.
+
+    A sort given an observer calls its hooks for every comparison, swap and
+    merge; subclasses override the events they are interested in. A sort
+    without an observer runs a separate loop with no hooks or logging in it,
+    which only keeps the totals it can count cheaply (see each sort).
+    """
+    def compare(self, a, b):
+        """Keys a and b were compared."""
+
+    def swap(self, i, j):
+        """The elements at positions i and j were exchanged."""
+
+    def merge(self, size):
+        """A sublist of size elements was merged (single elements included)."""
+
+    def counters(self):
+        """Counters added to the result dict of the sort."""
+        return {}
+
+
+class SortStats(SortObserver):
+    """Counts comparisons, swaps and merges."""
+    def __init__(self):
+        self.compares = 0
+        self.swaps = 0
+        self.merges = 0
+
+    def compare(self, a, b):
+        self.compares += 1
+
+    def swap(self, i, j):
+        self.swaps += 1
+
+    def merge(self, size):
+        self.merges += 1
+
+    def counters(self):
+        return {'compares': self.compares, 'swaps': self.swaps, 'merges': self.merges}
+
+
+class EventTrace(SortObserver):
+    """Records every event as a tuple, e.g. ('compare', a, b), ('swap', i, j) or ('merge', size)."""
+    def __init__(self, limit=None):
+        """
+        Args:
+            limit (int, optional): Defaults to None. Most events recorded;
+                later events are only counted in dropped.
+        """
+        self.events = []
+        self.limit = limit
+        self.dropped = 0
+
+    def _record(self, event):
+        if self.limit is None or len(self.events) < self.limit:
+            self.events.append(event)
+        else:
+            self.dropped += 1
+
+    def compare(self, a, b):
+        self._record(('compare', a, b))
+
+    def swap(self, i, j):
+        self._record(('swap', i, j))
+
+    def merge(self, size):
+        self._record(('merge', size))
+
+
+class SamplingProfiler(SortObserver):
+    """Timestamps every nth event, showing how work is spread over the run of a sort."""
+    def __init__(self, every=1000):
+        """
+        Args:
+            every (int, optional): Defaults to 1000. Events between samples.
+        """
+        self.every = every
+        self.events = 0
+        # (events so far, kind of event, nanoseconds since the first event)
+        self.samples = []
+        self.start = None
+
+    def _tick(self, kind):
+        if self.events % self.every == 0:
+            now = time.perf_counter_ns()
+            if self.start is None:
+                self.start = now
+            self.samples.append((self.events, kind, now - self.start))
+        self.events += 1
+
+    def compare(self, a, b):
+        self._tick('compare')
+
+    def swap(self, i, j):
+        self._tick('swap')
+
+    def merge(self, size):
+        self._tick('merge')
+
+
+class LoggingObserver(SortObserver):
+    """Logs every event to LOGGER at debug level."""
+    def compare(self, a, b):
+        LOGGER.debug('Comparing %s with %s', a, b)
+
+    def swap(self, i, j):
+        LOGGER.debug('Swapping positions %s and %s', i, j)
+
+    def merge(self, size):
+        LOGGER.debug('Merged %s elements', size)
+
+
+def bubble_sort(x, *, key=None, reverse=False, observer=None):
     """
     Sort an iterable object using the bubble sort algorithm.
 
@@ -32,7 +203,8 @@ def bubble_sort(x, *, key=None, reverse=False):
 
     For a list of size n, n-1 passes over the list must be performed, making
     a total of (1/2)*n^2 + (1/2)*n comparisons. Number of exchanges will vary
-    based on initial arrangement of list.
+    based on initial arrangement of list. Keys are computed once per element
+    and swapped alongside the elements they belong to.
 
     Args:
         x (iterable): Iterable collection (list, tuple, str, etc) to be sorted.
@@ -41,58 +213,76 @@ def bubble_sort(x, *, key=None, reverse=False):
             that function. (Should take one parameter and return one value).
         reversed (bool, optional): Defaults to False. Sorts list in descending
             order if True, ascending order otherwise.
+        observer (SortObserver, optional): Defaults to None. Notified of
+            every comparison and swap.
 
     Returns:
         dict: representation of results
             sorted: sorted version of original iterable
             compares: the total number of comparisons made during sort
             swaps: the total number of element swaps made
+            key_calls: the number of times key was called (0 without a key)
             time: the time required to perform sort (in nanoseconds)
+            plus the observer's counters, if it has any
 
     Examples:
-        print(merge_sort([5,2,4,1,3]))
-        >>> {'sorted': [1, 2, 3, 4, 5], 'compares': 10, 'swaps': 7, 'time': 5.3882598876953125e-05}
+        print(bubble_sort([5,2,4,1,3]))
+        >>> {'sorted': [1, 2, 3, 4, 5], 'compares': 10, 'swaps': 7, 'key_calls': 0, 'time': 5.3882598876953125e-05}
 
     """
-    num_compares = 0
-    num_swaps = 0
-
     sx = [*x]
 
-    if not key:
-        key = lambda x: x
+    start = time.time()  # record start time to compute runtime
 
-    LOGGER.info('Unsorted list: %s', sx)
+    # decorate: each key is computed once and kept in a list parallel to sx,
+    # without a key the elements are compared directly
+    keys = [key(item) for item in sx] if key else sx
+    num_key_calls = len(sx) if key else 0
 
-    start = time.time()  # record start time to compute runtime
+    LOGGER.info('Unsorted list: %s', sx)
 
-    # len(x) - 1 loops required to fully sort list
-    for loop in range(len(sx) - 1, 0, -1):
-        LOGGER.debug('loops remaining: %s', loop)
-        # the loop number (decreasing) also defines the number
-        # of elements to compare during each loop
-        for i in range(loop):
-            num_compares += 1
-            if key(sx[i]) > key(sx[i+1]):  # current element greater than next
-                LOGGER.debug('Swapping %s with %s', sx[i], sx[i+1])
-                num_swaps += 1
-                sx[i], sx[i+1] = sx[i+1], sx[i]  # swap current with next
-            LOGGER.debug(sx)
+    # every pass compares each remaining pair once, so only swaps are counted
+    num_compares = len(sx) * (len(sx) - 1) // 2
+    num_swaps = 0
+    if observer is None:
+        # len(x) - 1 loops required to fully sort list
+        for loop in range(len(sx) - 1, 0, -1):
+            # the loop number (decreasing) also defines the number
+            # of elements to compare during each loop
+            for i in range(loop):
+                # only strictly out of order neighbours are swapped, so equal
+                # keys keep their original order (stable) in both directions
+                if keys[i+1] > keys[i] if reverse else keys[i] > keys[i+1]:
+                    sx[i], sx[i+1] = sx[i+1], sx[i]  # swap current with next
+                    num_swaps += 1
+                    if keys is not sx:
+                        keys[i], keys[i+1] = keys[i+1], keys[i]  # keep keys parallel
+    else:
+        # the same loops, reporting each step to the observer
+        compare, swap = observer.compare, observer.swap
+        for loop in range(len(sx) - 1, 0, -1):
+            for i in range(loop):
+                compare(keys[i], keys[i+1])
+                if keys[i+1] > keys[i] if reverse else keys[i] > keys[i+1]:
+                    swap(i, i+1)
+                    sx[i], sx[i+1] = sx[i+1], sx[i]
+                    num_swaps += 1
+                    if keys is not sx:
+                        keys[i], keys[i+1] = keys[i+1], keys[i]
     LOGGER.info('Sorted List: %s', sx)
 
-    if reverse:
-        sx = sx[::-1]
-
     end = time.time()
     return {
         'sorted': sx,
         'compares': num_compares,
         'swaps': num_swaps,
+        **(observer.counters() if observer is not None else {}),
+        'key_calls': num_key_calls,
         'time': (end - start)
     }
 
 
-def merge_sort(x, *, key=None, reverse=False):
+def merge_sort(x, *, key=None, reverse=False, observer=None):
     """
     Sort an iterable object using the merge sort algorithm.
 
@@ -102,6 +292,9 @@ def merge_sort(x, *, key=None, reverse=False):
     one-to-one comparisons. Merge sort is much more performant than bubble
     sort, but still not perfectly optimized.
 
+    Positions of the elements are sorted by their precomputed keys, so each
+    key is computed once and elements are only moved once, at the end.
+
     Args:
         x (iterable): Iterable collection (list, tuple, str, etc) to be sorted.
         key (function, optional): Defaults to None. Function to be called on
@@ -109,17 +302,21 @@ def merge_sort(x, *, key=None, reverse=False):
             that function. (Should take one parameter and return one value).
         reversed (bool, optional): Defaults to False. Sorts list in descending
             order if True, ascending order otherwise.
+        observer (SortObserver, optional): Defaults to None. Notified of
+            every comparison and merge.
 
     Returns:
         dict: representation of results
             sorted: sorted version of original iterable
             compares: the total number of comparisons made during sort
-            swaps: the total number of element swaps made
+            merges: the total number of merges performed
+            key_calls: the number of times key was called (0 without a key)
             time: the time required to perform sort (in nanoseconds)
+            plus the observer's counters, if it has any
 
     Examples:
         print(merge_sort([5,2,4,1,3]))
-        >>> {'sorted': [1, 2, 3, 4, 5], 'compares': 8, 'merges': 9, 'time': 6.198883056640625e-05}
+        >>> {'sorted': [1, 2, 3, 4, 5], 'compares': 8, 'merges': 9, 'key_calls': 0, 'time': 6.198883056640625e-05}
 
     """
     start = time.time()
@@ -127,60 +324,1483 @@ def merge_sort(x, *, key=None, reverse=False):
     # raises TypeError if user tries to sort a non-iterable object
     sx = [*x]
 
-    # key allows user to sort the list based on some key function
-    if not key:
-        key = lambda x: x
-
-    def sort(li, num_compares=0, num_merges=0):
-        LOGGER.debug('Splitting %s', li)
+    # key allows user to sort the list based on some key function, computed
+    # once per element into a list parallel to sx (decorate)
+    keys = [key(item) for item in sx] if key else sx
+    num_key_calls = len(sx) if key else 0
+    num_compares = 0
 
+    def sort(li):
+        nonlocal num_compares
         if len(li) > 1:
             mid = len(li) // 2
-            left = li[:mid]
-            right = li[mid:]
-            left, num_compares, num_merges = sort(left, num_compares, num_merges)
-            right, num_compares, num_merges = sort(right, num_compares, num_merges)
+            left = sort(li[:mid])
+            right = sort(li[mid:])
 
             i = j = k = 0
 
             while i < len(left) and j < len(right):
-                num_compares += 1
-                if key(left[i]) < key(right[j]):
+                # ties take from the left half, which keeps the sort stable
+                if (keys[left[i]] >= keys[right[j]]) if reverse else (keys[left[i]] <= keys[right[j]]):
                     li[k] = left[i]
                     i += 1
                 else:
                     li[k] = right[j]
                     j += 1
                 k += 1
+            num_compares += k  # one comparison per element placed by the loop
 
-            while i < len(left):
-                li[k] = left[i]
-                i += 1
-                k += 1
+            # one half is exhausted, the rest of the other is already in order
+            li[k:] = left[i:] if i < len(left) else right[j:]
+        return li
 
-            while j < len(right):
-                li[k] = right[j]
-                j += 1
+    def sort_observed(li):
+        # the same algorithm, reporting each step to the observer
+        nonlocal num_compares
+        if len(li) > 1:
+            mid = len(li) // 2
+            left = sort_observed(li[:mid])
+            right = sort_observed(li[mid:])
+
+            i = j = k = 0
+
+            while i < len(left) and j < len(right):
+                observer.compare(keys[left[i]], keys[right[j]])
+                if (keys[left[i]] >= keys[right[j]]) if reverse else (keys[left[i]] <= keys[right[j]]):
+                    li[k] = left[i]
+                    i += 1
+                else:
+                    li[k] = right[j]
+                    j += 1
                 k += 1
+            num_compares += k
+
+            li[k:] = left[i:] if i < len(left) else right[j:]
+
+        observer.merge(len(li))
+        return li
+
+    # sort the positions 0..n-1 by key, then read the elements back in that
+    # order (undecorate)
+    order = list(range(len(sx)))
+    order = sort(order) if observer is None else sort_observed(order)
+    sx = [sx[i] for i in order]
+
+    end = time.time()
+    return {
+        'sorted': sx,
+        'compares': num_compares,
+        'merges': max(2 * len(sx) - 1, 1),  # every call of sort merges once, single elements included
+        **(observer.counters() if observer is not None else {}),
+        'key_calls': num_key_calls,
+        'time': (end - start)
+    }
+
+
+def _min_run(n):
+    """
+    Minimum run length for natural_merge_sort (as chosen by Timsort).
+
+    Returns a value between 32 and 64 (or n itself when n < 64) such that
+    n / min_run is a power of two or slightly less than one, so the bottom-up
+    merge levels stay balanced.
+    """
+    r = 0
+    while n >= 64:
+        r |= n & 1
+        n >>= 1
+    return n + r
+
+
+def _binary_insertion(a, keys, lt, lo, start, end):
+    """
+    Extend the sorted run a[lo:start] to a[lo:end] by binary insertion.
+
+    Returns:
+        int: the number of comparisons made
+    """
+    num_compares = 0
+    for i in range(start, end):
+        pivot = a[i]
+        pivot_key = keys[pivot]
+        left, right = lo, i
+        while left < right:
+            m = (left + right) // 2
+            num_compares += 1
+            if lt(pivot_key, keys[a[m]]):
+                right = m
+            else:
+                left = m + 1  # equal keys go after, keeping the sort stable
+        a[left + 1:i + 1] = a[left:i]
+        a[left] = pivot
+    return num_compares
+
+
+def _gallop(src, keys, lt, pivot_key, lo, hi, ties_first):
+    """
+    Count the leading elements of the sorted run src[lo:hi] which sort before pivot_key.
+
+    Probes 1, 3, 7, 15... elements ahead until it overshoots and then binary
+    searches the last gap, so a streak of m elements costs O(log m)
+    comparisons instead of m.
+
+    Args:
+        ties_first (bool): elements with a key equal to pivot_key count as
+            sorting before it (they belong to the earlier run)
+
+    Returns:
+        tuple: (number of elements before pivot_key, comparisons made)
+    """
+    num_compares = 0
+    good, bad = lo, hi  # src[lo:good] sort before the pivot, src[bad:hi] do not
+    step = 1
+    while good < bad:
+        probe = good + step - 1
+        if probe >= bad:
+            break
+        num_compares += 1
+        key = keys[src[probe]]
+        if (not lt(pivot_key, key)) if ties_first else lt(key, pivot_key):
+            good = probe + 1
+            step *= 2
+        else:
+            bad = probe
+            break
+    while good < bad:
+        m = (good + bad) // 2
+        num_compares += 1
+        key = keys[src[m]]
+        if (not lt(pivot_key, key)) if ties_first else lt(key, pivot_key):
+            good = m + 1
+        else:
+            bad = m
+    return good - lo, num_compares
+
+
+def _merge_runs(src, dst, keys, lt, lo, mid, hi):
+    """
+    Merge the sorted runs src[lo:mid] and src[mid:hi] into dst[lo:hi].
+
+    Ties are taken from the left run, keeping the merge stable. Once one run
+    wins MIN_GALLOP comparisons in a row the merge gallops: it finds the end
+    of the streak with _gallop and copies it in a single block.
+
+    Returns:
+        int: the number of comparisons made
+    """
+    num_compares = 1
+    if not lt(keys[src[mid]], keys[src[mid - 1]]):
+        dst[lo:hi] = src[lo:hi]  # runs are already in order
+        return num_compares
+
+    i, j, k = lo, mid, lo
+    left_wins = right_wins = 0
+    while i < mid and j < hi:
+        num_compares += 1
+        if lt(keys[src[j]], keys[src[i]]):
+            dst[k] = src[j]
+            j += 1
+            right_wins += 1
+            left_wins = 0
+        else:
+            dst[k] = src[i]
+            i += 1
+            left_wins += 1
+            right_wins = 0
+        k += 1
+
+        if left_wins >= MIN_GALLOP and j < hi:
+            count, compares = _gallop(src, keys, lt, keys[src[j]], i, mid, True)
+            dst[k:k + count] = src[i:i + count]
+            i += count
+            k += count
+            num_compares += compares
+            left_wins = 0
+        elif right_wins >= MIN_GALLOP and i < mid:
+            count, compares = _gallop(src, keys, lt, keys[src[i]], j, hi, False)
+            dst[k:k + count] = src[j:j + count]
+            j += count
+            k += count
+            num_compares += compares
+            right_wins = 0
+
+    # one run is exhausted, the rest of the other is already in order
+    dst[k:k + mid - i] = src[i:mid]
+    k += mid - i
+    dst[k:k + hi - j] = src[j:hi]
+    return num_compares
+
+
+def natural_merge_sort(x, *, key=None, reverse=False):
+    """
+    Sort an iterable object using a bottom-up natural merge sort.
+
+    Rather than recursively splitting the list in halves, the list is scanned
+    once for runs that are already ascending (or strictly descending, which
+    are reversed in place). Runs shorter than a minimum length are extended
+    with binary insertion sort, then neighbouring runs are merged pairwise,
+    level by level, until one run remains. Merges gallop through long streaks
+    taken from one run. This is a simplified version of the Timsort algorithm
+    used by python's builtin sorted(): sorted or reversed input is a single
+    run and costs only n - 1 comparisons.
+
+    Each level merges from the working list into one auxiliary buffer
+    allocated up front and the two then swap roles, so no per-merge copies of
+    the list are made.
+
+    Args:
+        x (iterable): Iterable collection (list, tuple, str, etc) to be sorted.
+        key (function, optional): Defaults to None. Function to be called on
+            each element of iterable. Sort will be performed on the return of
+            that function. (Should take one parameter and return one value).
+        reversed (bool, optional): Defaults to False. Sorts list in descending
+            order if True, ascending order otherwise.
+
+    Returns:
+        dict: representation of results
+            sorted: sorted version of original iterable
+            compares: the total number of comparisons made during sort
+            merges: the total number of run merges performed
+            runs: the number of runs the list was split into before merging
+            key_calls: the number of times key was called (0 without a key)
+            time: the time required to perform sort (in nanoseconds)
+
+    Examples:
+        print(natural_merge_sort([5,2,4,1,3]))
+        >>> {'sorted': [1, 2, 3, 4, 5], 'compares': 8, 'merges': 0, 'runs': 1, 'key_calls': 0,
+             'time': 8.106231689453125e-06}
+
+    """
+    start = time.time()
+
+    sx = [*x]
+    keys = [key(item) for item in sx] if key else sx
+    num_key_calls = len(sx) if key else 0
+
+    order, num_compares, num_merges, num_runs = _natural_order(keys, reverse)
+    sx = [sx[i] for i in order]
+
+    end = time.time()
+    return {
+        'sorted': sx,
+        'compares': num_compares,
+        'merges': num_merges,
+        'runs': num_runs,
+        'key_calls': num_key_calls,
+        'time': (end - start)
+    }
+
+
+def _natural_order(keys, reverse):
+    """
+    Stable order of keys found by natural_merge_sort.
+
+    Returns:
+        tuple: (positions of keys in sorted order, comparisons made, merges
+            performed, initial runs)
+    """
+    n = len(keys)
+    # a descending sort flips every comparison rather than reversing the
+    # result, so equal keys stay in their original order
+    lt = operator.gt if reverse else operator.lt
+
+    order = list(range(n))
+    num_compares = 0
+    num_merges = 0
+
+    # split into runs of at least min_run elements
+    min_run = _min_run(n)
+    bounds = [0]  # run i is order[bounds[i]:bounds[i + 1]]
+    lo = 0
+    while lo < n:
+        # order[lo:] is untouched, so order[i] == i there
+        hi = lo + 1
+        if hi < n:
+            num_compares += 1
+            descending = lt(keys[hi], keys[lo])
+            hi += 1
+            while hi < n:
+                num_compares += 1
+                if lt(keys[hi], keys[hi - 1]) != descending:
+                    break
+                hi += 1
+            if descending:  # strictly descending, so reversing keeps it stable
+                order[lo:hi] = reversed(order[lo:hi])
+        end = min(lo + min_run, n)
+        if hi < end:
+            num_compares += _binary_insertion(order, keys, lt, lo, hi, end)
+            hi = end
+        LOGGER.debug('Run %s', order[lo:hi])
+        bounds.append(hi)
+        lo = hi
+    num_runs = len(bounds) - 1
+
+    # merge neighbouring runs level by level, alternating between the two lists
+    buffer = [0] * n
+    src, dst = order, buffer
+    while len(bounds) > 2:
+        merged = [0]
+        for r in range(0, len(bounds) - 1, 2):
+            lo, mid = bounds[r], bounds[r + 1]
+            if r + 2 < len(bounds):
+                hi = bounds[r + 2]
+                num_compares += _merge_runs(src, dst, keys, lt, lo, mid, hi)
+                num_merges += 1
+            else:
+                hi = mid
+                dst[lo:hi] = src[lo:hi]  # odd run out moves to the next level as is
+            merged.append(hi)
+        bounds = merged
+        src, dst = dst, src
+
+    return src, num_compares, num_merges, num_runs
+
+
+def _write_run(entries, directory, block):
+    """
+    Serialize sorted entries to a new file as a sequence of pickled blocks of block entries.
+
+    Returns:
+        tuple: (path of the run file, number of bytes written)
+    """
+    entries = iter(entries)
+    fd, path = tempfile.mkstemp(suffix='.run', dir=directory)
+    with os.fdopen(fd, 'wb') as f:
+        while True:
+            entries_block = list(itertools.islice(entries, block))
+            if not entries_block:
+                break
+            pickle.dump(entries_block, f, pickle.HIGHEST_PROTOCOL)
+        return path, f.tell()
+
+
+def _read_run(path, stats):
+    """Stream the entries of a run file one block at a time, then delete it."""
+    try:
+        with open(path, 'rb') as f:
+            position = 0
+            while True:
+                try:
+                    block = pickle.load(f)
+                except EOFError:
+                    break
+                stats['bytes_read'] += f.tell() - position
+                position = f.tell()
+                yield from block
+    finally:
+        os.remove(path)
+
+
+def external_sort(iterable, *, key=None, reverse=False, memory_limit=64 * 2 ** 20, max_open=64,
+                  directory=None):
+    """
+    Sort a stream which may be larger than memory using an external merge sort.
+
+    The input is consumed once, in chunks of roughly memory_limit bytes. Each
+    chunk is sorted in memory and written to a temporary file (a run) as
+    pickled blocks of at most RUN_BLOCK elements. The runs are then combined
+    with a heap based k-way merge that holds only one block of each run in
+    memory; blocks hold about memory_limit // max_open bytes, so the merge
+    stays within memory_limit too.
+    When there are more than max_open runs they are merged in groups of
+    max_open over several passes first, so at most max_open run files are
+    ever open at once. Input which fits in a single chunk never touches disk.
+
+    Keys are computed once per element and stored in the runs next to their
+    elements. Runs are sorted stably and merged in input order, so the sort is
+    stable in both directions.
+
+    Args:
+        iterable (iterable): Iterable collection or stream to be sorted; it
+            is only iterated once.
+        key (function, optional): Defaults to None. Function to be called on
+            each element of iterable. Sort will be performed on the return of
+            that function. (Should take one parameter and return one value).
+        reversed (bool, optional): Defaults to False. Sorts list in descending
+            order if True, ascending order otherwise.
+        memory_limit (int, optional): Defaults to 64 MiB. Approximate bytes
+            of elements (and keys) held in memory while forming and merging
+            runs, as measured by sys.getsizeof.
+        max_open (int, optional): Defaults to 64. Most run files merged (and
+            open) at once; must be at least 2.
+        directory (str, optional): Defaults to the system temporary
+            directory. Where run files are written.
+
+    Returns:
+        dict: representation of results
+            sorted: generator of the sorted elements; run files are removed
+                once it is exhausted, closed or garbage collected
+            runs: the number of sorted runs the input was split into
+            passes: the number of merge passes over the data, including the
+                final merge performed by the generator
+            bytes_written: the total bytes written to run files
+            bytes_read: the total bytes read back from run files (the final
+                pass is counted as the generator is consumed)
+            key_calls: the number of times key was called (0 without a key)
+            time: the time required to form the runs and perform all but the
+                final merge (in nanoseconds)
+
+    Examples:
+        result = external_sort(iter([5,2,4,1,3]))
+        print(list(result['sorted']), result['runs'], result['bytes_written'])
+        >>> [1, 2, 3, 4, 5] 1 0
+
+    """
+    if max_open < 2:
+        raise ValueError('max_open must be at least 2, got {}'.format(max_open))
+
+    start = time.time()
+    stats = {
+        'sorted': None,
+        'runs': 0,
+        'passes': 0,
+        'bytes_written': 0,
+        'bytes_read': 0,
+        'key_calls': 0,
+        'time': 0,
+    }
+    # with a key, runs hold (key, element) pairs and are ordered by the key
+    sort_key = operator.itemgetter(0) if key else None
+
+    workdir = tempfile.mkdtemp(prefix='external_sort_', dir=directory)
+    try:
+        runs = []
+        block = None  # entries per block of a run file, sized from the first full chunk
+        chunk, chunk_bytes = [], 0
+        for item in iterable:
+            chunk_bytes += sys.getsizeof(item) + 8  # the element and the list slot referencing it
+            if key:
+                item_key = key(item)
+                stats['key_calls'] += 1
+                chunk_bytes += sys.getsizeof(item_key) + 64  # the key and the pair holding it
+                item = (item_key, item)
+            chunk.append(item)
+            if chunk_bytes >= memory_limit:
+                if block is None:
+                    # a merge holds one block of each of up to max_open runs
+                    block = max(1, min(RUN_BLOCK, memory_limit // max_open * len(chunk) // chunk_bytes))
+                chunk.sort(key=sort_key, reverse=reverse)
+                path, nbytes = _write_run(chunk, workdir, block)
+                LOGGER.debug('Wrote run of %s elements (%s bytes)', len(chunk), nbytes)
+                runs.append(path)
+                stats['bytes_written'] += nbytes
+                chunk, chunk_bytes = [], 0
+        stats['runs'] = len(runs) + bool(chunk)
+        chunk.sort(key=sort_key, reverse=reverse)
+
+        if not runs:
+            # everything fit in memory
+            shutil.rmtree(workdir)
+            stats['sorted'] = (entry[1] for entry in chunk) if key else iter(chunk)
+            stats['time'] = time.time() - start
+            return stats
+
+        if chunk:
+            path, nbytes = _write_run(chunk, workdir, block)
+            runs.append(path)
+            stats['bytes_written'] += nbytes
+        del chunk
+
+        # intermediate passes merge consecutive groups of runs, which keeps
+        # equal keys in input order
+        while len(runs) > max_open:
+            merged = []
+            for i in range(0, len(runs), max_open):
+                group = runs[i:i + max_open]
+                if len(group) == 1:
+                    merged.append(group[0])  # carried to the next pass as is
+                    continue
+                readers = [_read_run(path, stats) for path in group]
+                path, nbytes = _write_run(heapq.merge(*readers, key=sort_key, reverse=reverse), workdir, block)
+                merged.append(path)
+                stats['bytes_written'] += nbytes
+            LOGGER.debug('Merge pass reduced %s runs to %s', len(runs), len(merged))
+            runs = merged
+            stats['passes'] += 1
+    except BaseException:
+        shutil.rmtree(workdir, ignore_errors=True)
+        raise
+
+    def final_merge():
+        try:
+            merged = heapq.merge(*(_read_run(path, stats) for path in runs), key=sort_key, reverse=reverse)
+            if key:
+                for entry in merged:
+                    yield entry[1]
+            else:
+                yield from merged
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    stats['passes'] += 1
+    stats['sorted'] = final_merge()
+    # a generator dropped before it starts never runs its finally block
+    weakref.finalize(stats['sorted'], shutil.rmtree, workdir, True)
+    stats['time'] = time.time() - start
+    return stats
+
+
+def _numeric_typecode(items):
+    """
+    Array typecode able to hold every item exactly, if there is one.
+
+    Returns:
+        str: 'q' when all items are ints within 64 bits, 'd' when all are
+            floats, None otherwise
+    """
+    if not items:
+        return None
+    if all(type(item) is float for item in items):
+        return 'd'
+    if all(type(item) is int for item in items) and -2 ** 63 <= min(items) and max(items) < 2 ** 63:
+        return 'q'
+    return None
+
+
+def _sort_chunk(keys, reverse):
+    """Process pool task: stable order of one chunk of keys."""
+    order, num_compares, num_merges, _ = _natural_order(keys, reverse)
+    return order, num_compares, num_merges
+
+
+def _sort_shared_chunk(name, typecode, lo, hi, reverse):
+    """Process pool task: sort elements lo:hi of a shared memory array in place."""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        view = shm.buf.cast(typecode)
+        values = view[lo:hi].tolist()
+        order, num_compares, num_merges, _ = _natural_order(values, reverse)
+        view[lo:hi] = array(typecode, [values[i] for i in order])
+        view.release()
+    finally:
+        shm.close()
+    return num_compares, num_merges
+
+
+def parallel_merge_sort(x, *, key=None, reverse=False, workers=None):
+    """
+    Sort an iterable object by sorting chunks of it in parallel processes.
+
+    The list is split into one contiguous chunk per worker, each chunk is
+    sorted with natural_merge_sort in a process pool, and the sorted chunks
+    are combined with a heap based k-way merge. Lists of ints (within 64 bits)
+    or floats are passed to the workers through a shared memory array which
+    they sort in place, so only the chunk bounds are pickled. Other elements
+    (or their keys, when a key is given) are pickled to the workers, which
+    send back the sorted order of their chunk.
+
+    Chunks are merged in input order and sorted stably, so the sort is stable
+    in both directions. Inputs shorter than PARALLEL_THRESHOLD are sorted in
+    this process.
+
+    Args:
+        x (iterable): Iterable collection (list, tuple, str, etc) to be sorted.
+        key (function, optional): Defaults to None. Function to be called on
+            each element of iterable. Sort will be performed on the return of
+            that function. (Should take one parameter and return one value).
+            It is called in this process, so it does not need to be picklable,
+            but the keys it returns do.
+        reversed (bool, optional): Defaults to False. Sorts list in descending
+            order if True, ascending order otherwise.
+        workers (int, optional): Defaults to the number of CPUs. Number of
+            worker processes (and chunks).
+
+    Returns:
+        dict: representation of results
+            sorted: sorted version of original iterable
+            compares: the total number of comparisons made sorting the chunks
+                (comparisons inside the final heap merge are not counted)
+            merges: the total number of run merges, plus one for the final
+                k-way merge
+            key_calls: the number of times key was called (0 without a key)
+            workers: the number of processes the chunks were sorted in
+            time: the time required to perform sort (in nanoseconds)
+
+    Examples:
+        print(parallel_merge_sort([5,2,4,1,3]))
+        >>> {'sorted': [1, 2, 3, 4, 5], 'compares': 8, 'merges': 0, 'key_calls': 0, 'workers': 1,
+             'time': 1.52587890625e-05}
+
+    """
+    start = time.time()
+
+    sx = [*x]
+    n = len(sx)
+    keys = [key(item) for item in sx] if key else sx
+    num_key_calls = n if key else 0
+    workers = min(workers or os.cpu_count(), max(n, 1))
+
+    if workers == 1 or n < PARALLEL_THRESHOLD:
+        order, num_compares, num_merges, _ = _natural_order(keys, reverse)
+        end = time.time()
+        return {
+            'sorted': [sx[i] for i in order],
+            'compares': num_compares,
+            'merges': num_merges,
+            'key_calls': num_key_calls,
+            'workers': 1,
+            'time': (end - start)
+        }
+
+    size = -(-n // workers)  # elements per chunk, rounded up
+    chunks = [(lo, min(lo + size, n)) for lo in range(0, n, size)]
+    typecode = None if key else _numeric_typecode(sx)
+
+    if typecode:
+        # created before the pool, so the workers share this process's
+        # resource tracker rather than each starting one that would unlink
+        # the block when the worker exits
+        shm = shared_memory.SharedMemory(create=True, size=n * array(typecode).itemsize)
+        try:
+            view = shm.buf.cast(typecode)
+            view[:] = array(typecode, sx)
+            with multiprocessing.Pool(workers) as pool:
+                counts = pool.starmap(_sort_shared_chunk,
+                                      [(shm.name, typecode, lo, hi, reverse) for lo, hi in chunks])
+            runs = [view[lo:hi].tolist() for lo, hi in chunks]
+            view.release()
+        finally:
+            shm.close()
+            shm.unlink()
+        sx = list(heapq.merge(*runs, reverse=reverse))
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            results = pool.starmap(_sort_chunk, [(keys[lo:hi], reverse) for lo, hi in chunks])
+        counts = [(num_compares, num_merges) for _, num_compares, num_merges in results]
+        # positions in the whole list of each chunk's elements, in sorted order
+        runs = [[lo + i for i in order] for (order, _, _), (lo, _) in zip(results, chunks)]
+        sx = [sx[i] for i in heapq.merge(*runs, key=keys.__getitem__, reverse=reverse)]
+    LOGGER.debug('Merged %s chunks sorted by %s workers', len(chunks), workers)
+
+    end = time.time()
+    return {
+        'sorted': sx,
+        'compares': sum(num_compares for num_compares, _ in counts),
+        'merges': sum(num_merges for _, num_merges in counts) + 1,
+        'key_calls': num_key_calls,
+        'workers': workers,
+        'time': (end - start)
+    }
+
 
-        num_merges += 1
-        LOGGER.debug('Merging %s', li)
-        return (li, num_compares, num_merges)
+def _integer_range(keys):
+    """
+    Smallest and largest key when every key is an integer.
+
+    Returns:
+        tuple: (min key, max key), or None if keys is empty or any key is not
+            integer-like (bools and numpy integers count as integers)
+    """
+    if len(keys) == 0:
+        return None
+    # checking the exact type first is much cheaper than the abstract class
+    if not all(type(k) is int for k in keys) and not all(isinstance(k, numbers.Integral) for k in keys):
+        return None
+    return min(keys), max(keys)
 
-    sx, num_compares, num_merges = sort(sx)
 
+def _counting_order(keys, low, high, reverse):
+    """
+    Stable order of integer keys in low..high by distributing them into one bucket per value.
+
+    Returns:
+        list: positions of keys in sorted order
+    """
+    buckets = [[] for _ in range(high - low + 1)]
+    for i, k in enumerate(keys):
+        buckets[k - low].append(i)
     if reverse:
-        sx = sx[::-1]
+        buckets.reverse()  # buckets keep input order, so equal keys stay stable
+    return [i for bucket in buckets for i in bucket]
+
+
+def _lsd_order(keys, reverse):
+    """
+    Stable order of 64 bit integer keys by LSD radix sort on a numpy array.
+
+    Keys are offset so the smallest is 0 (or, descending, subtracted from the
+    largest), then sorted RADIX_BITS bits at a time from the least
+    significant digit up with a stable counting sort per digit. Only as many
+    passes as the offset keys have digits are made.
+
+    Returns:
+        tuple: (numpy array of positions in sorted order, passes made, bytes
+            moved)
+
+    Raises:
+        OverflowError: if a key does not fit in 64 bits
+    """
+    values = np.asarray(keys, dtype=np.int64)
+    if not len(values):
+        return np.arange(0), 0, 0
+    # flipping the sign bit maps int64 onto uint64 in the same order
+    values = values.view(np.uint64) ^ np.uint64(1 << 63)
+    values = values.max() - values if reverse else values - values.min()
+
+    order = np.arange(len(values))
+    num_passes = num_bytes = 0
+    mask = np.uint64((1 << RADIX_BITS) - 1)
+    for shift in range(0, int(values.max()).bit_length(), RADIX_BITS):
+        digits = ((values >> np.uint64(shift)) & mask).astype(np.uint16)
+        # numpy's stable sort of 16 bit integers is itself a counting (radix) sort
+        step = np.argsort(digits, kind='stable')
+        order = order[step]
+        values = values[step]
+        num_passes += 1
+        num_bytes += len(values) * (values.itemsize + order.itemsize)
+    return order, num_passes, num_bytes
+
+
+def _msd_order(keys, reverse):
+    """
+    Stable order of byte string keys by MSD radix sort.
+
+    Keys are distributed into 257 buckets by their first byte (one bucket for
+    keys which have already ended, which sort first), and every bucket
+    holding more than one key is distributed again by the next byte. Buckets
+    of at most MSD_CUTOFF keys are finished by natural merge sort instead.
+
+    Returns:
+        tuple: (positions of keys in sorted order, distribution passes made,
+            bytes moved)
+    """
+    n = len(keys)
+    order = list(range(n))
+    num_passes = num_bytes = 0
+    stack = [(0, n, 0)]  # order[lo:hi] all share their first depth bytes
+    while stack:
+        lo, hi, depth = stack.pop()
+        if hi - lo <= MSD_CUTOFF:
+            segment = order[lo:hi]
+            suborder, _, _, _ = _natural_order([keys[i] for i in segment], reverse)
+            order[lo:hi] = [segment[i] for i in suborder]
+            continue
+
+        buckets = [[] for _ in range(257)]
+        for i in order[lo:hi]:
+            k = keys[i]
+            buckets[k[depth] + 1 if len(k) > depth else 0].append(i)
+        num_passes += 1
+        num_bytes += (hi - lo) * POINTER_SIZE
+        if reverse:
+            buckets.reverse()  # ended keys are now last
+
+        for b, bucket in enumerate(buckets):
+            if bucket:
+                order[lo:lo + len(bucket)] = bucket
+                ended = b == (256 if reverse else 0)  # equal keys, already in input order
+                if len(bucket) > 1 and not ended and any(len(keys[i]) > depth + 1 for i in bucket):
+                    stack.append((lo, lo + len(bucket), depth + 1))
+                lo += len(bucket)
+    return order, num_passes, num_bytes
+
+
+def _distribution_sort(x, key, reverse, algorithm, keys=None, key_range=None):
+    """
+    Shared driver of counting_sort and radix_sort.
+
+    Picks counting sort, LSD or MSD radix sort by the type and range of the
+    keys (preferring the requested algorithm), or falls back to natural merge
+    sort when the keys are neither integers nor strings. my_sort passes in
+    the list of keys of x (and their range) it has already computed.
+    """
+    start = time.time()
+
+    if keys is not None:
+        sx = x
+        key_range = key_range or _integer_range(keys)
+    elif np is not None and isinstance(x, np.ndarray) and key is None and x.ndim == 1 and (
+            x.dtype.kind == 'i' or x.dtype.kind == 'u' and x.dtype.itemsize < 8):
+        sx = keys = x  # sorted as an array and returned as one
+        key_range = (int(x.min()), int(x.max())) if len(x) else (0, 0)
+    else:
+        sx = [*x]
+        keys = [key(item) for item in sx] if key else sx
+        key_range = _integer_range(keys)
+    n = len(sx)
+    num_key_calls = n if key else 0
+
+    order = None
+    if key_range is not None:
+        low, high = key_range
+        small = high - low <= 2 * n + 256
+        fits = -2 ** 63 <= low and high < 2 ** 63
+        if np is not None and fits and not (small and algorithm == 'counting_sort'):
+            used = 'lsd_radix_sort'
+            order, num_passes, num_bytes = _lsd_order(keys, reverse)
+        elif small:
+            used = 'counting_sort'
+            order = _counting_order(keys, low, high, reverse)
+            num_passes, num_bytes = 2, 2 * n * POINTER_SIZE
+    elif algorithm == 'radix_sort' and n and (all(type(k) is bytes for k in keys) or
+                                              all(type(k) is str for k in keys)):
+        used = 'msd_radix_sort'
+        if type(keys[0]) is str:
+            keys = [k.encode('utf-8') for k in keys]  # UTF-8 bytes sort in code point order
+        order, num_passes, num_bytes = _msd_order(keys, reverse)
+
+    if order is None:
+        LOGGER.info('Keys are not integers or strings, falling back to natural merge sort')
+        order, num_compares, num_merges, num_runs = _natural_order(keys, reverse)
+        sx = [sx[i] for i in order]
+        end = time.time()
+        return {
+            'sorted': sx,
+            'compares': num_compares,
+            'merges': num_merges,
+            'runs': num_runs,
+            'key_calls': num_key_calls,
+            'algorithm': 'natural_merge_sort',
+            'time': (end - start)
+        }
+
+    if np is not None and sx is keys and isinstance(sx, np.ndarray):
+        sx = sx[order]
+    else:
+        if np is not None and isinstance(order, np.ndarray):
+            order = order.tolist()
+        sx = [sx[i] for i in order]
+
+    end = time.time()
+    return {
+        'sorted': sx,
+        'passes': num_passes,
+        'bytes_moved': num_bytes,
+        'key_calls': num_key_calls,
+        'algorithm': used,
+        'time': (end - start)
+    }
+
+
+def counting_sort(x, *, key=None, reverse=False):
+    """
+    Sort an iterable object with integer keys in a small range using counting sort.
+
+    Counting sort never compares keys: every element is placed into a bucket
+    for its key's value, then the buckets are read back in order. This costs
+    O(n + k) for n elements with k possible key values, which beats any
+    comparison sort when k is small (digits, ratings, ages...). Keys whose
+    range is much larger than the input are sorted by radix_sort instead, and
+    keys which are not integers by natural_merge_sort.
+
+    Args:
+        x (iterable): Iterable collection (list, tuple, str, etc) to be sorted.
+        key (function, optional): Defaults to None. Function to be called on
+            each element of iterable. Sort will be performed on the return of
+            that function. (Should take one parameter and return one value).
+        reversed (bool, optional): Defaults to False. Sorts list in descending
+            order if True, ascending order otherwise.
+
+    Returns:
+        dict: representation of results
+            sorted: sorted version of original iterable
+            passes: the number of passes moving every element (distributing
+                into buckets and reading them back)
+            bytes_moved: the bytes of elements (or references) those passes
+                moved
+            key_calls: the number of times key was called (0 without a key)
+            algorithm: the algorithm used, 'counting_sort' unless the keys
+                called for another (see radix_sort)
+            time: the time required to perform sort (in nanoseconds)
+            The natural_merge_sort fallback reports compares, merges and runs
+            in place of passes and bytes_moved.
+
+    Examples:
+        print(counting_sort([5,2,4,1,3]))
+        >>> {'sorted': [1, 2, 3, 4, 5], 'passes': 2, 'bytes_moved': 80, 'key_calls': 0, 'algorithm': 'counting_sort',
+             'time': 1.1920928955078125e-05}
+
+    """
+    return _distribution_sort(x, key, reverse, 'counting_sort')
+
+
+def radix_sort(x, *, key=None, reverse=False):
+    """
+    Sort an iterable object by the digits or bytes of its keys using radix sort.
+
+    Radix sort never compares keys, it distributes them by one digit at a
+    time. Integer keys (within 64 bits, including numpy integer arrays) are
+    sorted by an LSD radix sort on numpy arrays, RADIX_BITS bits per pass;
+    without numpy, integers in a small range use counting sort. Byte string
+    keys, and str keys by their UTF-8 encoding, are sorted by an MSD radix
+    sort, which only looks at as many leading bytes as it takes to tell keys
+    apart. Any other keys fall back to natural_merge_sort. Every variant is
+    stable in both directions.
+
+    Args:
+        x (iterable): Iterable collection (list, tuple, str, etc) to be sorted.
+            A one dimensional numpy integer array is sorted as an array.
+        key (function, optional): Defaults to None. Function to be called on
+            each element of iterable. Sort will be performed on the return of
+            that function. (Should take one parameter and return one value).
+        reversed (bool, optional): Defaults to False. Sorts list in descending
+            order if True, ascending order otherwise.
+
+    Returns:
+        dict: representation of results
+            sorted: sorted version of original iterable (a numpy array if
+                one was given)
+            passes: the number of distribution passes over the elements
+            bytes_moved: the bytes of keys, positions or references those
+                passes moved
+            key_calls: the number of times key was called (0 without a key)
+            algorithm: the algorithm used, 'lsd_radix_sort', 'msd_radix_sort',
+                'counting_sort' or 'natural_merge_sort'
+            time: the time required to perform sort (in nanoseconds)
+            The natural_merge_sort fallback reports compares, merges and runs
+            in place of passes and bytes_moved.
+
+    Examples:
+        print(radix_sort(['pear', 'fig', 'apple', 'figs']))
+        >>> {'sorted': ['apple', 'fig', 'figs', 'pear'], 'passes': 0, 'bytes_moved': 0, 'key_calls': 0,
+             'algorithm': 'msd_radix_sort', 'time': 2.86102294921875e-05}
+
+    """
+    return _distribution_sort(x, key, reverse, 'radix_sort')
+
+
+def _choose_strategy(keys):
+    """
+    Pick the sorting strategy for my_sort from a sample of the keys.
+
+    Short inputs are sorted by insertion. Otherwise adjacent pairs of keys
+    are sampled at evenly spaced positions first: if every sampled pair is in
+    the same order the input is (close to) a few long runs, which natural
+    merge sort merges in about n comparisons, faster than any distribution
+    sort. Failing that integer keys are radix sorted with numpy (or counted,
+    without it, when their range is small), which takes a few linear passes
+    whatever their order, string keys are radix sorted, and anything else is
+    merge sorted, in parallel when the input is large and several CPUs are
+    free.
+
+    Returns:
+        tuple: (strategy, which is one of 'insertion', 'counting', 'radix',
+            'run_merge', 'parallel' or 'merge'; (min, max) of the keys when
+            they are all integers, else None)
+    """
+    n = len(keys)
+    if n < INSERTION_THRESHOLD:
+        return 'insertion', None
+
+    step = max((n - 1) // SAMPLE_SIZE, 1)
+    sample = range(0, n - 1, step)
+    ascending = descending = 0
+    for i in sample:
+        if keys[i] <= keys[i + 1]:
+            ascending += 1
+        if keys[i] >= keys[i + 1]:
+            descending += 1
+    if max(ascending, descending) == len(sample):
+        return 'run_merge', None
+
+    if all(isinstance(keys[i], numbers.Integral) for i in sample):
+        key_range = _integer_range(keys)
+        if key_range is not None:
+            low, high = key_range
+            if np is not None and -2 ** 63 <= low and high < 2 ** 63:
+                return 'radix', key_range
+            if high - low <= 2 * n + 256:
+                return 'counting', key_range
+
+    if type(keys[0]) in (str, bytes) and all(type(keys[i]) is type(keys[0]) for i in sample):
+        return 'radix', None
+    if n >= MY_SORT_PARALLEL and (os.cpu_count() or 1) > 1:
+        return 'parallel', None
+    return 'merge', None
+
+
+def my_sort(x, *, key=None, reverse=False):
+    """
+    Sort an iterable object with the algorithm best suited to it.
+
+    The keys are computed once and sampled (see _choose_strategy) to pick one
+    of: binary insertion sort for short inputs, natural_merge_sort for
+    presorted input ('insertion', 'run_merge' and 'merge'), counting_sort or
+    radix_sort for integer and string keys, and parallel_merge_sort for large
+    inputs on several CPUs. Every strategy is stable, so the result is always
+    the same as sorted(x, key=key, reverse=reverse).
+
+    Args:
+        x (iterable): Iterable collection (list, tuple, str, etc) to be sorted.
+        key (function, optional): Defaults to None. Function to be called on
+            each element of iterable. Sort will be performed on the return of
+            that function. (Should take one parameter and return one value).
+        reversed (bool, optional): Defaults to False. Sorts list in descending
+            order if True, ascending order otherwise.
+
+    Returns:
+        dict: representation of results
+            sorted: sorted version of original iterable
+            strategy: the strategy chosen for the input
+            key_calls: the number of times key was called (0 without a key)
+            time: the time required to perform sort (in nanoseconds)
+            plus the counters reported by the algorithm that sorted it
+
+    Examples:
+        print(my_sort([5,2,4,1,3]))
+        >>> {'sorted': [1, 2, 3, 4, 5], 'compares': 8, 'merges': 0, 'runs': 1, 'key_calls': 0,
+             'time': 2.6941299438476562e-05, 'strategy': 'insertion'}
+
+    """
+    start = time.time()
+
+    sx = [*x]
+    keys = [key(item) for item in sx] if key else sx
+    strategy, key_range = _choose_strategy(keys)
+    LOGGER.info('Sorting %s elements with strategy %s', len(sx), strategy)
+
+    if strategy in ('counting', 'radix'):
+        # reuse the keys and their range rather than computing them again
+        algorithm = 'counting_sort' if strategy == 'counting' else 'radix_sort'
+        result = _distribution_sort(sx, None, reverse, algorithm, keys=keys, key_range=key_range)
+        result['key_calls'] = len(sx) if key else 0
+        result['time'] = time.time() - start
+        result['strategy'] = strategy
+        return result
+
+    method = {
+        'insertion': natural_merge_sort,  # a single run, extended by binary insertion
+        'run_merge': natural_merge_sort,
+        'parallel': parallel_merge_sort,
+        'merge': natural_merge_sort,
+    }[strategy]
+    if key:
+        # sort the positions by the keys already computed, then read the
+        # elements back in that order
+        result = method(range(len(sx)), key=keys.__getitem__, reverse=reverse)
+        result['sorted'] = [sx[i] for i in result['sorted']]
+        result['key_calls'] = len(sx)
+    else:
+        result = method(sx, reverse=reverse)
+
+    result['time'] = time.time() - start
+    result['strategy'] = strategy
+    return result
+
+
+def _top_k_order(keys, k, reverse):
+    """
+    Positions of the first k keys in stable sorted order, without sorting all of them.
+
+    The best k positions found so far are kept sorted, followed by new
+    candidates: only keys which beat the current kth key are admitted (a tie
+    loses, the kth key came first). Once there are k candidates the 2k
+    positions are sorted with _natural_order, whose first run is the best k
+    already in order, and cut back to k. Each element costs one comparison
+    against the kth key, and each sort of 2k positions admits k new ones,
+    so the whole selection is O(n log k).
+
+    Returns:
+        tuple: (positions of the k keys in sorted order, comparisons made,
+            merges performed)
+    """
+    n = len(keys)
+    k = max(0, min(k, n))
+    if k == 0:
+        return [], 0, 0
+    lt = operator.gt if reverse else operator.lt
+
+    num_compares = 0
+    num_merges = 0
+    pool = list(range(min(2 * k, n)))
+    i = len(pool)
+    while True:
+        # best positions all precede the candidates, so the sort keeps ties in input order
+        order, compares, merges, _ = _natural_order([keys[p] for p in pool], reverse)
+        num_compares += compares
+        num_merges += merges
+        pool = [pool[o] for o in order[:k]]
+        if i >= n:
+            return pool, num_compares, num_merges
+
+        bound = keys[pool[-1]]
+        while i < n and len(pool) < 2 * k:
+            num_compares += 1
+            if lt(keys[i], bound):
+                pool.append(i)
+            i += 1
+
+
+def top_k(x, k, *, key=None, reverse=False):
+    """
+    Select the k smallest elements of an iterable object, in sorted order.
+
+    The result is the same as sorted(x, key=key, reverse=reverse)[:k] (so
+    reverse selects the k largest), but only a buffer of at most 2k
+    positions is ever sorted (see _top_k_order): O(n log k) rather than
+    O(n log n), and a single comparison for most elements once the best k
+    are settled.
+
+    Args:
+        x (iterable): Iterable collection (list, tuple, str, etc) to select from.
+        k (int): Number of elements to select; all of them if k >= len(x).
+        key (function, optional): Defaults to None. Function to be called on
+            each element of iterable. Selection will be performed on the
+            return of that function. (Should take one parameter and return
+            one value).
+        reversed (bool, optional): Defaults to False. Selects the largest
+            elements in descending order if True, the smallest in ascending
+            order otherwise.
+
+    Returns:
+        dict: representation of results
+            sorted: the k selected elements in sorted order
+            compares: the total number of comparisons made
+            merges: the total number of run merges performed
+            key_calls: the number of times key was called (0 without a key)
+            time: the time required to perform selection (in nanoseconds)
+
+    Examples:
+        print(top_k([5,2,4,1,3], 2))
+        >>> {'sorted': [1, 2], 'compares': 8, 'merges': 0, 'key_calls': 0, 'time': 1.2874603271484375e-05}
+
+    """
+    start = time.time()
+
+    sx = [*x]
+    keys = [key(item) for item in sx] if key else sx
+    num_key_calls = len(sx) if key else 0
+
+    order, num_compares, num_merges = _top_k_order(keys, k, reverse)
+    sx = [sx[i] for i in order]
 
     end = time.time()
     return {
         'sorted': sx,
         'compares': num_compares,
         'merges': num_merges,
+        'key_calls': num_key_calls,
         'time': (end - start)
     }
 
 
+def partial_sort(x, k, *, key=None, reverse=False):
+    """
+    Sort only the first k elements of an iterable object.
+
+    The first k elements of the result are those of sorted(x, key=key,
+    reverse=reverse)[:k], selected as in top_k. The remaining elements
+    follow in their original order.
+
+    Args:
+        x (iterable): Iterable collection (list, tuple, str, etc) to be sorted.
+        k (int): Number of leading elements to sort.
+        key (function, optional): Defaults to None. Function to be called on
+            each element of iterable. Sort will be performed on the return of
+            that function. (Should take one parameter and return one value).
+        reversed (bool, optional): Defaults to False. Sorts the first k
+            elements in descending order if True, ascending order otherwise.
+
+    Returns:
+        dict: representation of results
+            sorted: the k sorted elements followed by the rest
+            compares: the total number of comparisons made
+            merges: the total number of run merges performed
+            key_calls: the number of times key was called (0 without a key)
+            time: the time required to perform sort (in nanoseconds)
+
+    Examples:
+        print(partial_sort([5,2,4,1,3], 2))
+        >>> {'sorted': [1, 2, 5, 4, 3], 'compares': 8, 'merges': 0, 'key_calls': 0, 'time': 1.52587890625e-05}
+
+    """
+    start = time.time()
+
+    sx = [*x]
+    keys = [key(item) for item in sx] if key else sx
+    num_key_calls = len(sx) if key else 0
+
+    order, num_compares, num_merges = _top_k_order(keys, k, reverse)
+    selected = bytearray(len(sx))
+    for i in order:
+        selected[i] = 1
+    sx = [sx[i] for i in order] + [item for item, chosen in zip(sx, selected) if not chosen]
+
+    end = time.time()
+    return {
+        'sorted': sx,
+        'compares': num_compares,
+        'merges': num_merges,
+        'key_calls': num_key_calls,
+        'time': (end - start)
+    }
+
+
+class SortedList(object):
+    """
+    Sequence which stays sorted as elements are added.
+
+    The elements are held in chunks, each a sorted python list of up to
+    2 * load elements, with the last key of every chunk in a separate index.
+    Adding an element bisects the index for its chunk and the chunk for its
+    position, so an insert only moves the elements of one chunk however long
+    the list grows; a chunk growing past 2 * load is split in two. Equal keys
+    keep the order they were added in, as in a stable sort.
+
+    Batches are sorted with _natural_order and merged in with _merge_runs,
+    or inserted one by one when they are small next to the list.
+
+    Examples:
+        scores = SortedList(key=lambda x: x['score'])
+        scores.update(records)
+        scores.merge(sorted_batch)
+        scores[0], scores[scores.bisect_left(50):scores.bisect_right(60)]
+    """
+    def __init__(self, iterable=(), *, key=None, load=1000):
+        """
+        Args:
+            iterable (iterable, optional): Defaults to (). Initial elements.
+            key (function, optional): Defaults to None. Function to be called
+                once on each element added; elements are ordered by its
+                return.
+            load (int, optional): Defaults to 1000. Size of the chunks
+                (which hold between 1 and 2 * load elements).
+        """
+        self.key = key
+        self.load = load
+        self._lists = []  # chunks of elements, in order
+        self._keys = []  # keys of each chunk's elements (the chunks themselves without a key)
+        self._maxes = []  # last key of each chunk
+        self._offsets = None  # position of each chunk's first element, built on demand
+        self._len = 0
+        self.compares = 0
+        self.merges = 0
+        self.splits = 0
+        self.key_calls = 0
+        self._rebuild([], [])
+        self.update(iterable)
+
+    def counters(self):
+        """Comparisons and merges made by batch operations, chunk splits and key calls so far."""
+        return {
+            'compares': self.compares,
+            'merges': self.merges,
+            'splits': self.splits,
+            'key_calls': self.key_calls,
+            'chunks': len(self._lists),
+        }
+
+    def _key_of(self, value):
+        if self.key is None:
+            return value
+        self.key_calls += 1
+        return self.key(value)
+
+    def _rebuild(self, values, keys):
+        """Replace the contents with sorted values and their keys, in full chunks."""
+        load = self.load
+        self._lists = [values[i:i + load] for i in range(0, len(values), load)]
+        if self.key is None:
+            self._keys = self._lists
+        else:
+            self._keys = [keys[i:i + load] for i in range(0, len(keys), load)]
+        self._maxes = [chunk[-1] for chunk in self._keys]
+        self._len = len(values)
+        self._offsets = None
+
+    def _insert(self, value, k):
+        if not self._maxes:
+            self._rebuild([value], [k])
+            return
+        # the first chunk whose last key is greater, or the last chunk
+        c = min(bisect.bisect_right(self._maxes, k), len(self._maxes) - 1)
+        values, keys = self._lists[c], self._keys[c]
+        i = bisect.bisect_right(keys, k)  # after any equal keys
+        values.insert(i, value)
+        if keys is not values:
+            keys.insert(i, k)
+        self._maxes[c] = keys[-1]
+        self._len += 1
+        self._offsets = None
+
+        if len(values) > 2 * self.load:
+            half = len(values) // 2
+            self._lists[c:c + 1] = [values[:half], values[half:]]
+            if self._keys is not self._lists:
+                self._keys[c:c + 1] = [keys[:half], keys[half:]]
+            self._maxes[c:c + 1] = [self._keys[c][-1], self._keys[c + 1][-1]]
+            self.splits += 1
+
+    def _positions(self):
+        if self._offsets is None:
+            self._offsets = [0, *itertools.accumulate(len(chunk) for chunk in self._lists)]
+        return self._offsets
+
+    def add(self, value):
+        """Insert one element after any others with an equal key."""
+        self._insert(value, self._key_of(value))
+
+    def update(self, iterable):
+        """
+        Insert every element of an iterable object.
+
+        Args:
+            iterable (iterable): elements to add, in any order
+
+        Returns:
+            dict: representation of results
+                inserted: the number of elements added
+                compares: the total number of comparisons made
+                merges: the total number of run merges performed
+                key_calls: the number of times key was called (0 without a key)
+                time: the time required to insert (in nanoseconds)
+        """
+        start = time.time()
+        key_calls = self.key_calls
+
+        values = [*iterable]
+        keys = [self._key_of(value) for value in values] if self.key else values
+        order, num_compares, num_merges, _ = _natural_order(keys, False)
+        values = [values[i] for i in order]
+        keys = values if self.key is None else [keys[i] for i in order]
+        self.compares += num_compares
+        self.merges += num_merges
+
+        result = self._merge_in(values, keys, start)
+        result['compares'] += num_compares
+        result['merges'] += num_merges
+        result['key_calls'] = self.key_calls - key_calls
+        return result
+
+    def merge(self, iterable):
+        """
+        Merge in a batch of elements which is already sorted.
+
+        Args:
+            iterable (iterable): elements to add, in order of their keys
+
+        Raises:
+            ValueError: if the batch is out of order
+
+        Returns:
+            dict: representation of results
+                inserted: the number of elements added
+                compares: the total number of comparisons made
+                merges: the total number of run merges performed
+                key_calls: the number of times key was called (0 without a key)
+                time: the time required to insert (in nanoseconds)
+        """
+        start = time.time()
+        key_calls = self.key_calls
+
+        values = [*iterable]
+        keys = [self._key_of(value) for value in values] if self.key else values
+        for i in range(1, len(keys)):
+            if keys[i] < keys[i - 1]:
+                raise ValueError('merge() needs a sorted batch, element {} is out of order'.format(i))
+        self.compares += max(len(keys) - 1, 0)
+
+        result = self._merge_in(values, keys, start)
+        result['compares'] += max(len(keys) - 1, 0)
+        result['key_calls'] = self.key_calls - key_calls
+        return result
+
+    def _merge_in(self, values, keys, start):
+        """Add sorted values with their keys, inserting them one by one if the batch is small."""
+        inserted = len(values)
+        num_compares = 0
+        num_merges = 0
+        if len(values) * INSERT_RATIO < self._len:
+            for value, k in zip(values, keys):
+                self._insert(value, k)
+        elif values:
+            old_values = list(itertools.chain.from_iterable(self._lists))
+            old_keys = old_values if self.key is None else list(itertools.chain.from_iterable(self._keys))
+            n, m = len(old_values), len(values)
+            if n:
+                # the existing elements come first, so they win ties
+                all_keys = old_keys + keys
+                src = list(range(n + m))
+                dst = [0] * (n + m)
+                num_compares = _merge_runs(src, dst, all_keys, operator.lt, 0, n, n + m)
+                num_merges = 1
+                all_values = old_values + values
+                values = [all_values[i] for i in dst]
+                keys = values if self.key is None else [all_keys[i] for i in dst]
+            self._rebuild(values, keys)
+        self.compares += num_compares
+        self.merges += num_merges
+
+        end = time.time()
+        return {
+            'inserted': inserted,
+            'compares': num_compares,
+            'merges': num_merges,
+            'key_calls': 0,
+            'time': (end - start)
+        }
+
+    def bisect_left(self, k):
+        """Position of the first element whose key is not less than k."""
+        c = bisect.bisect_left(self._maxes, k)
+        if c == len(self._maxes):
+            return self._len
+        return self._positions()[c] + bisect.bisect_left(self._keys[c], k)
+
+    def bisect_right(self, k):
+        """Position after the last element whose key is not greater than k."""
+        c = bisect.bisect_right(self._maxes, k)
+        if c == len(self._maxes):
+            return self._len
+        return self._positions()[c] + bisect.bisect_right(self._keys[c], k)
+
+    def _locate(self, index):
+        """Chunk and position within it of the element at index."""
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError('SortedList index out of range')
+        offsets = self._positions()
+        c = bisect.bisect_right(offsets, index) - 1
+        return c, index - offsets[c]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._len))]
+        c, i = self._locate(index)
+        return self._lists[c][i]
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(self._lists)
+
+    def __contains__(self, value):
+        k = self._key_of(value)
+        return any(self[i] == value for i in range(self.bisect_left(k), self.bisect_right(k)))
+
+    def remove(self, value):
+        """
+        Remove the first element equal to value.
+
+        Raises:
+            ValueError: if value is not in the list
+        """
+        k = self._key_of(value)
+        for index in range(self.bisect_left(k), self.bisect_right(k)):
+            c, i = self._locate(index)
+            values, keys = self._lists[c], self._keys[c]
+            if values[i] == value:
+                del values[i]
+                if keys is not values:
+                    del keys[i]
+                if values:
+                    self._maxes[c] = keys[-1]
+                else:
+                    del self._lists[c]
+                    if self._keys is not self._lists:
+                        del self._keys[c]
+                    del self._maxes[c]
+                self._len -= 1
+                self._offsets = None
+                return
+        raise ValueError('{!r} is not in SortedList'.format(value))
+
+    def __repr__(self):
+        return 'SortedList({!r})'.format(list(self))
+
+
 def time_base(x, *, key=None, reverse=False):
     """
     Wrapper around builtin sorted method to allow easy timing.
@@ -257,6 +1877,219 @@ if __name__ == '__main__':
         base_int_time, base_str_time, base_dicts_time, '', ''
     ))
 
+    # An expensive key function (here the digest of each record) dominates the
+    # runtime of a sort that calls it on every comparison. Keys are now
+    # computed once per element, so the number of key calls equals the list
+    # size instead of twice the number of comparisons.
+    import hashlib
+
+    def digest_key(item):
+        return hashlib.sha256(repr(sorted(item.items())).encode()).hexdigest()
+
+    print('Sorting the list of dictionaries by an expensive key function')
+    print('{:<14}{:>12}{:>12}{:>26}'.format(
+        'Sort Method', 'Time (s)', 'key calls', 'key calls (per compare)'))
+    for name, method in (('Bubble Sort', bubble_sort), ('Merge Sort', merge_sort)):
+        result = method(list_of_dicts, key=digest_key)
+        assert result['sorted'] == sorted(list_of_dicts, key=digest_key)
+        print('{:<14}{:>12.6f}{:>12}{:>26}'.format(
+            name, result['time'], result['key_calls'], 2 * result['compares']))
+    print('{:<14}{:>12.6f}{:>12}'.format(
+        'Base Sort', time_base(list_of_dicts, key=digest_key)['time'], len(list_of_dicts)))
+
+    # natural_merge_sort finds existing runs and merges bottom up through one
+    # auxiliary buffer, while merge_sort always splits down to single elements
+    # and copies both halves at every level
+    n = 100000
+    distributions = {
+        'random': [random.random() for _ in range(n)],
+        'sorted': list(range(n)),
+        'reversed': list(range(n, 0, -1)),
+        'sorted blocks': [v for _ in range(20) for v in sorted(random.randrange(n) for _ in range(n // 20))],
+    }
+    print('Sorting {} elements'.format(n))
+    print('{:<15}{:>16}{:>14}{:>24}{:>14}{:>16}'.format(
+        'Input', 'merge_sort (s)', 'compares', 'natural_merge_sort (s)', 'compares', 'time_base (s)'))
+    for name, li in distributions.items():
+        merge = merge_sort(li)
+        natural = natural_merge_sort(li)
+        assert natural['sorted'] == merge['sorted']
+        print('{:<15}{:>16.4f}{:>14}{:>24.4f}{:>14}{:>16.4f}'.format(
+            name, merge['time'], merge['compares'], natural['time'], natural['compares'],
+            time_base(li)['time']))
+
+    # external_sort keeps only about memory_limit bytes of the input in memory
+    # at a time, spilling sorted runs to disk and merging them back as a stream
+    n = 1000000
+    stream = (random.randrange(10 ** 9) for _ in range(n))
+    result = external_sort(stream, memory_limit=8 * 2 ** 20, max_open=16)
+    start_time = time.time()
+    previous = count = 0
+    for value in result['sorted']:
+        assert value >= previous
+        previous = value
+        count += 1
+    assert count == n
+    print('external_sort of {} integers in 8 MiB: {} runs, {} merge passes, {:.1f} MB written, {:.1f} MB read, '
+          '{:.2f}s (runs and intermediate passes {:.2f}s)'.format(
+              n, result['runs'], result['passes'], result['bytes_written'] / 1e6, result['bytes_read'] / 1e6,
+              result['time'] + time.time() - start_time, result['time']))
+    print('time_base of the same integers in memory: {:.2f}s'.format(
+        time_base([random.randrange(10 ** 9) for _ in range(n)])['time']))
+
+    # parallel_merge_sort splits the list across processes; floats travel
+    # through shared memory. merge_sort is only timed at the smaller size.
+    print('{:<10}{:>16}{:>30}{:>10}{:>16}'.format(
+        'Elements', 'merge_sort (s)', 'parallel_merge_sort (s)', 'speedup', 'time_base (s)'))
+    for n in (10 ** 6, 10 ** 7):
+        li = [random.random() for _ in range(n)]
+        parallel = parallel_merge_sort(li, workers=os.cpu_count())
+        merge_time = merge_sort(li)['time'] if n <= 10 ** 6 else None
+        print('{:<10}{:>16}{:>30}{:>10}{:>16.4f}'.format(
+            n, '{:.4f}'.format(merge_time) if merge_time else '-',
+            '{:.4f} ({} workers)'.format(parallel['time'], parallel['workers']),
+            '{:.2f}x'.format(merge_time / parallel['time']) if merge_time else '-',
+            time_base(li)['time']))
+        del li, parallel
+
+    # The demo workloads have tiny key domains (10 integers, 26 letters), so
+    # distributing them into buckets beats comparing them
+    n = 100000
+    workloads = {
+        'ints 0-9': ([random.randrange(10) for _ in range(n)], None),
+        'lowercase str': (''.join(random.choice(LETTERS) for _ in range(n)), None),
+        'dicts by num': ([{'num': random.randrange(10), 'chr': random.choice(LETTERS)} for _ in range(n)],
+                         lambda x: x['num']),
+        'dicts by chr': ([{'num': random.randrange(10), 'chr': random.choice(LETTERS)} for _ in range(n)],
+                         lambda x: x['chr']),
+        'ints 0-10^12': ([random.randrange(10 ** 12) for _ in range(n)], None),
+    }
+    print('Sorting {} elements with small key domains'.format(n))
+    print('{:<15}{:>18}{:>18}{:>8}{:>26}{:>16}'.format(
+        'Input', 'radix_sort (s)', 'algorithm', 'passes', 'natural_merge_sort (s)', 'time_base (s)'))
+    for name, (li, sort_key) in workloads.items():
+        radix = radix_sort(li, key=sort_key)
+        natural = natural_merge_sort(li, key=sort_key)
+        assert radix['sorted'] == natural['sorted']
+        print('{:<15}{:>18.4f}{:>18}{:>8}{:>26.4f}{:>16.4f}'.format(
+            name, radix['time'], radix['algorithm'], radix['passes'], natural['time'],
+            time_base(li, key=sort_key)['time']))
+    if np is not None:
+        array_of_ints = np.random.default_rng(0).integers(-2 ** 40, 2 ** 40, size=10 ** 6)
+        radix = radix_sort(array_of_ints)
+        start_time = time.time()
+        assert (np.sort(array_of_ints) == radix['sorted']).all()
+        print('radix_sort of 10^6 int64 array: {:.4f}s, {} passes, {:.0f} MB moved (np.sort {:.4f}s)'.format(
+            radix['time'], radix['passes'], radix['bytes_moved'] / 1e6, time.time() - start_time))
+
+    # my_sort against every single algorithm across input shapes: it should
+    # never be much slower than the best of them
+    n = 50000
+    nearly_sorted = list(range(n))
+    for _ in range(n // 1000):
+        i, j = random.randrange(n), random.randrange(n)
+        nearly_sorted[i], nearly_sorted[j] = nearly_sorted[j], nearly_sorted[i]
+    matrix = {
+        'random floats': ([random.random() for _ in range(n)], None),
+        'sorted': (list(range(n)), None),
+        'reversed': (list(range(n, 0, -1)), None),
+        'nearly sorted': (nearly_sorted, None),
+        'ints 0-9': ([random.randrange(10) for _ in range(n)], None),
+        'ints 0-10^9': ([random.randrange(10 ** 9) for _ in range(n)], None),
+        'words': ([''.join(random.choices(LETTERS, k=random.randrange(3, 10))) for _ in range(n)], None),
+        'dicts by chr': ([{'num': random.randrange(10), 'chr': random.choice(LETTERS)} for _ in range(n)],
+                         lambda x: x['chr']),
+        'tuples': ([(random.randrange(100), random.random()) for _ in range(n)], None),
+        '50 floats': ([random.random() for _ in range(50)], None),
+    }
+    candidates = {
+        'merge_sort': merge_sort,
+        'natural_merge_sort': natural_merge_sort,
+        'counting_sort': counting_sort,
+        'radix_sort': radix_sort,
+    }
+    print('Sorting {} elements (times in seconds)'.format(n))
+    print('{:<15}'.format('Input') + ''.join('{:>20}'.format(name) for name in candidates) +
+          '{:>12}{:>12}{:>10}{:>12}'.format('my_sort', 'strategy', 'vs best', 'time_base'))
+    for name, (li, sort_key) in matrix.items():
+        times = {method: sort(li, key=sort_key)['time'] for method, sort in candidates.items()}
+        result = my_sort(li, key=sort_key)
+        assert result['sorted'] == sorted(li, key=sort_key)
+        print('{:<15}'.format(name) + ''.join('{:>20.4f}'.format(times[method]) for method in candidates) +
+              '{:>12.4f}{:>12}{:>10.2f}{:>12.4f}'.format(
+                  result['time'], result['strategy'], result['time'] / min(times.values()),
+                  time_base(li, key=sort_key)['time']))
+
+    # top_k sorts only a buffer of 2k positions, against sorting everything
+    # and slicing; heapq.nsmallest is the C implemented bounded heap
+    n = 200000
+    li = [random.random() for _ in range(n)]
+    print('Selecting the k smallest of {} floats (times in seconds)'.format(n))
+    print('{:>8}{:>12}{:>12}{:>28}{:>20}{:>16}'.format(
+        'k', 'top_k', 'compares', 'natural_merge_sort[:k]', 'heapq.nsmallest', 'time_base[:k]'))
+    for k in (10, 1000, 20000):
+        result = top_k(li, k)
+        start_time = time.time()
+        assert result['sorted'] == heapq.nsmallest(k, li)
+        heap_time = time.time() - start_time
+        assert partial_sort(li, k)['sorted'][:k] == result['sorted']
+        print('{:>8}{:>12.4f}{:>12}{:>28.4f}{:>20.4f}{:>16.4f}'.format(
+            k, result['time'], result['compares'], natural_merge_sort(li)['time'], heap_time,
+            time_base(li)['time']))
+
+    # SortedList inserts move the elements of one chunk, bisect.insort into a
+    # plain list moves everything after the insertion point
+    n = 200000
+    sorted_list = SortedList()
+    start_time = time.time()
+    for value in li[:n]:
+        sorted_list.add(value)
+    add_time = time.time() - start_time
+    plain = []
+    start_time = time.time()
+    for value in li[:n]:
+        bisect.insort(plain, value)
+    print('{} single inserts: SortedList {:.4f}s, bisect.insort {:.4f}s'.format(
+        n, add_time, time.time() - start_time))
+    assert list(sorted_list) == plain
+
+    sorted_list = SortedList(key=lambda x: x['num'])
+    result = sorted_list.update({'num': random.randrange(10 ** 6), 'chr': random.choice(LETTERS)}
+                                for _ in range(10 ** 6))
+    print('Bulk insert of 10^6 dicts: {:.4f}s, {} compares'.format(result['time'], result['compares']))
+    for size in (1000, 100000, 1000000):
+        batch = [{'num': num, 'chr': 'x'} for num in sorted(random.randrange(10 ** 6) for _ in range(size))]
+        result = sorted_list.merge(batch)
+        print('Merge of a sorted batch of {}: {:.4f}s, {} compares'.format(size, result['time'], result['compares']))
+    start_time = time.time()
+    for _ in range(100000):
+        num = random.randrange(10 ** 6)
+        lo, hi = sorted_list.bisect_left(num), sorted_list.bisect_right(num)
+        assert all(item['num'] == num for item in sorted_list[lo:hi])
+    print('100000 range lookups in {} elements: {:.4f}s'.format(len(sorted_list), time.time() - start_time))
+    print(sorted_list.counters())
+
+    # Cost of instrumentation: with no observer the sorts run loops free of
+    # hooks and logging, keeping only their cheap totals; every observer adds
+    # its hook calls to each step
+    observers = {
+        'none': lambda: None,
+        'SortStats': SortStats,
+        'EventTrace': lambda: EventTrace(limit=10 ** 6),
+        'SamplingProfiler': SamplingProfiler,
+        'LoggingObserver': LoggingObserver,
+    }
+    for name, method, n in (('bubble_sort', bubble_sort, 2000), ('merge_sort', merge_sort, 100000)):
+        li = [random.random() for _ in range(n)]
+        print('{} of {} elements'.format(name, n))
+        print('{:<18}{:>12}{:>12}'.format('Observer', 'Time (s)', 'overhead'))
+        fast = None
+        for observer_name, make_observer in observers.items():
+            result = method(li, observer=make_observer())
+            assert result['sorted'] == sorted(li)
+            fast = fast or result['time']
+            print('{:<18}{:>12.4f}{:>11.2f}x'.format(observer_name, result['time'], result['time'] / fast))
+
     # Now ready to test sort algorithms against lists of different sizes to
     # measure efficiency gains at scale
 